@@ -21,7 +21,8 @@ class ConfigManager:
         "backup_keep_days": 30,
         "show_hidden_files": False,
         "enable_advanced_features": False,
-        "backup_rotation_count": 10
+        "backup_rotation_count": 10,
+        "regex_backend": "re"
     }
     
     CONFIG_VALIDATION = {
@@ -32,7 +33,8 @@ class ConfigManager:
         "backup_keep_days": {"type": int, "min": 1, "max": 365},
         "show_hidden_files": {"type": bool},
         "enable_advanced_features": {"type": bool},
-        "backup_rotation_count": {"type": int, "min": 1, "max": 100}
+        "backup_rotation_count": {"type": int, "min": 1, "max": 100},
+        "regex_backend": {"type": str, "choices": ("re", "re2")}
     }
 
     def __init__(self, base_path: str):
@@ -74,6 +76,9 @@ class ConfigManager:
                 return False
             if "max" in validation and value > validation["max"]:
                 return False
+
+        if "choices" in validation and value not in validation["choices"]:
+            return False
         
         return True
 
@@ -5,10 +5,11 @@ Handles file operations, backups, and file history
 """
 
 import os
+import mmap
 import shutil
 import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import hashlib
 
 
@@ -21,6 +22,7 @@ class FileManager:
         self.backup_dir = os.path.join(base_path, '.patch_backups')
         self.file_history = []
         self.max_history = 10
+        self._binary_cache = {}  # abs path -> (mtime_ns, is_binary)
         
         # Create backup directory
         os.makedirs(self.backup_dir, exist_ok=True)
@@ -217,6 +219,57 @@ class FileManager:
             print(f"❌ Error writing file: {e}")
             return False
 
+    def open_mmap(self, file_path: str) -> Optional[mmap.mmap]:
+        """Map a file read-only, or None when it cannot be mapped (e.g. empty files)"""
+        file_abs_path = self.resolve_path(file_path)
+
+        try:
+            with open(file_abs_path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+    def iter_files_with_suffixes(self, root: str, suffixes: Optional[Tuple[str, ...]] = None) -> Iterator[os.DirEntry]:
+        """Yield files under root whose names end with one of suffixes (all files if None), skipping hidden directories"""
+        stack = [self.resolve_path(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            # Same as os.walk: symlinked directories are listed but not followed
+                            if not entry.name.startswith('.') and not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        elif suffixes is None or entry.name.endswith(suffixes):
+                            yield entry
+            except OSError:
+                continue
+            # Reversed so directories are visited in listing order, as os.walk does
+            stack.extend(reversed(subdirs))
+
+    def is_binary_file(self, file_path: str, sniff_size: int = 4096) -> bool:
+        """Check for a NUL byte in the first sniff_size bytes, cached by mtime"""
+        file_abs_path = self.resolve_path(file_path)
+
+        try:
+            mtime_ns = os.stat(file_abs_path).st_mtime_ns
+            cached = self._binary_cache.get(file_abs_path)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+
+            with open(file_abs_path, 'rb') as f:
+                is_binary = b'\x00' in f.read(sniff_size)
+        except OSError:
+            return False
+
+        self._binary_cache[file_abs_path] = (mtime_ns, is_binary)
+        return is_binary
+
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists"""
         return os.path.isfile(self.resolve_path(file_path))
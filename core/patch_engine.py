@@ -6,9 +6,10 @@ Core patching logic and operations
 
 import re
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from difflib import unified_diff
-from utils import RegexUtils, LineUtils, PatchValidator
+from itertools import groupby
+from utils import RegexUtils, LineUtils, PatchValidator, compile_pattern, required_literal
 
 class PatchEngine:
     """Core patching engine with advanced operations"""
@@ -20,22 +21,25 @@ class PatchEngine:
         self.line_utils = LineUtils()
         self.patch_validator = PatchValidator(self.regex_utils)
         self._regex_cache = {}
+        self.regex_backend = config_manager.get('regex_backend', 're') if config_manager else 're'
         self.applied_patches = []
 
-    def _get_compiled_regex(self, pattern: str) -> Optional[re.Pattern]:
+    def _get_compiled_regex(self, pattern: Union[str, re.Pattern]) -> Optional[re.Pattern]:
         """Get compiled regex from cache or compile new one"""
+        if not isinstance(pattern, str):
+            return pattern  # Already compiled, by re or another backend
         if pattern in self._regex_cache:
             return self._regex_cache[pattern]
 
         try:
-            compiled = re.compile(pattern)
+            compiled = compile_pattern(pattern, self.regex_backend)
             self._regex_cache[pattern] = compiled
             return compiled
         except re.error as e:
             print(f"❌ Invalid regex pattern: {e}")
             return None
 
-    def find_code_blocks(self, file_info: Dict[str, Any], search_pattern: str,
+    def find_code_blocks(self, file_info: Dict[str, Any], search_pattern: Union[str, re.Pattern],
                         context_lines: int = 3) -> List[Dict[str, Any]]:
         """Find code blocks matching pattern with context"""
         matches = []
@@ -80,6 +84,14 @@ class PatchEngine:
                 if not is_valid:
                     return False, {"error": f"Patch validation failed: {message}"}
 
+        # Files no pattern can touch are left alone: no backup, no rewrite
+        if self._no_pattern_can_match(file_path, patches):
+            return False, {
+                "error": "No patches were successfully applied",
+                "failed_patches": [{'patch': patch, 'error': f"Pattern not found: {patch.get('pattern', '')}"}
+                                   for patch in patches]
+            }
+
         # Create backup
         backup_success, backup_path = self.file_manager.create_backup(file_path)
         if not backup_success and self.config_manager.get('auto_backup', True):
@@ -100,9 +112,27 @@ class PatchEngine:
                               key=lambda x: x.get('line_number', x.get('start_line', 0)),
                               reverse=True)
 
-        for patch in sorted_patches:
-            try:
-                success, result = self._apply_single_patch(working_lines, patch)
+        # Python patches with a syntax-tree transform share one parse of the file
+        ast_patches = [patch for patch in sorted_patches if patch.get('ast_transform')]
+        if ast_patches and file_path.endswith('.py'):
+            ast_results = self._apply_ast_patches(working_lines, ast_patches)
+            if ast_results is not None:
+                for patch, (success, result) in zip(ast_patches, ast_results):
+                    if success:
+                        successful_patches.append({'patch': patch, 'result': result})
+                    else:
+                        failed_patches.append({'patch': patch, 'error': result})
+                sorted_patches = [patch for patch in sorted_patches if not patch.get('ast_transform')]
+
+        # Consecutive pattern replacements share one pass over the lines
+        for batchable, group in groupby(sorted_patches, key=self._is_line_local_replacement):
+            group = list(group)
+            if batchable and len(group) > 1:
+                outcomes = zip(group, self._patch_replace_patterns(working_lines, group))
+            else:
+                outcomes = ((patch, self._apply_single_patch(working_lines, patch)) for patch in group)
+
+            for patch, (success, result) in outcomes:
                 if success:
                     successful_patches.append({
                         'patch': patch,
@@ -113,11 +143,6 @@ class PatchEngine:
                         'patch': patch,
                         'error': result
                     })
-            except Exception as e:
-                failed_patches.append({
-                    'patch': patch,
-                    'error': str(e)
-                })
 
         # Calculate changes
         changes_applied = len(successful_patches) > 0
@@ -152,29 +177,105 @@ class PatchEngine:
                 "failed_patches": failed_patches
             }
 
+    # Group references that would point elsewhere once patterns are joined into one alternation
+    _UNCOMBINABLE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+    # Constructs whose meaning differs between one line and the whole file
+    _WHOLE_FILE_UNSAFE = re.compile(r'\\[AZz]|\(\?[=!<]')
+    # Bytes where bytes and str patterns disagree: str '\s' also matches \x1c-\x1f, and non-ASCII
+    _UNSAFE_BYTES = re.compile(rb'[\x1c-\x1f\x80-\xff]')
+
+    def _no_pattern_can_match(self, file_path: str, patches: List[Dict[str, Any]]) -> bool:
+        """Prove from a memory map that no line matches any of the replacement patterns"""
+        if not all(self._is_line_local_replacement(patch) and not patch.get('ast_transform') for patch in patches):
+            return False
+
+        regexes = [self._get_compiled_regex(patch.get('_compiled') or patch.get('pattern', '')) for patch in patches]
+        if not all(isinstance(regex, re.Pattern) for regex in regexes):
+            return False
+
+        # Every match contains its pattern's required literal, whatever the file's characters
+        literals = [required_literal(regex.pattern, regex.flags) for regex in regexes]
+
+        combined = None
+        if all(regex.flags == re.UNICODE and regex.pattern.isascii()
+               and not self._UNCOMBINABLE.search(regex.pattern)
+               and not self._WHOLE_FILE_UNSAFE.search(regex.pattern) for regex in regexes):
+            try:
+                combined = re.compile('|'.join(f'(?:{regex.pattern})' for regex in regexes).encode('ascii'),
+                                      re.MULTILINE)
+            except re.error:
+                pass
+
+        if not all(literals) and combined is None:
+            return False
+
+        mapped = self.file_manager.open_mmap(file_path)
+        if mapped is None:
+            return False
+        with mapped:
+            if all(literals) and all(mapped.find(literal.encode('utf-8')) == -1 for literal in literals):
+                return True
+            # Lines are read with universal newlines, so '$', '\n' and '\s' see CR/CRLF endings
+            # differently from the raw bytes; a miss proves nothing then
+            if combined is None or mapped.find(b'\r') != -1:
+                return False
+            # Bytes and str patterns only agree on plain ASCII text, so a miss proves nothing otherwise
+            return not combined.search(mapped) and not self._UNSAFE_BYTES.search(mapped)
+
+    def _apply_ast_patches(self, lines: List[str], patches: List[Dict[str, Any]]) -> Optional[List[Tuple[bool, str]]]:
+        """Run each distinct syntax-tree transform over one parse of the lines, or None to fall back to regex"""
+        from patches._transforms import TRANSFORMS, run_transforms
+
+        names = list(dict.fromkeys(patch['ast_transform'] for patch in patches))
+        if not all(name in TRANSFORMS for name in names):
+            return None
+
+        try:
+            source, counts = run_transforms(''.join(lines), names)
+        except Exception:
+            return None  # Source the parser rejects keeps the regex patches
+        lines[:] = source.splitlines(keepends=True)
+
+        # Sub-patches naming the same transform share its single run
+        outcomes = {}
+        for name, count in zip(names, counts):
+            if count:
+                outcomes[name] = (True, f"Applied {name} at {count} locations")
+            else:
+                outcomes[name] = (False, f"{name} found nothing to change")
+        return [outcomes[patch['ast_transform']] for patch in patches]
+
+    @staticmethod
+    def _is_line_local_replacement(patch: Dict[str, Any]) -> bool:
+        """Whether a patch rewrites matching lines anywhere in the file rather than at a fixed line"""
+        patch_type = patch.get('type')
+        return patch_type == 'replace_pattern_all' or (patch_type == 'replace_pattern' and not patch.get('match_line'))
+
+    # One lookup per patch instead of walking an if/elif chain over the type names
+    _PATCH_HANDLERS = {
+        'insert_at_line': lambda self, lines, patch: self._patch_insert_at_line(lines, patch['line_number'], patch['code']),
+        'replace_range': lambda self, lines, patch: self._patch_replace_range(lines, patch['start_line'], patch['end_line'], patch['code']),
+        'replace_pattern': lambda self, lines, patch: self._patch_replace_pattern(lines, patch['pattern'], patch['code'], patch.get('match_line')),
+        'replace_pattern_all': lambda self, lines, patch: self._patch_replace_pattern_all(lines, patch['pattern'], patch['code']),
+        'insert_after': lambda self, lines, patch: self._patch_insert_after(lines, patch['after'], patch['code']),
+        'insert_before': lambda self, lines, patch: self._patch_insert_before(lines, patch['before'], patch['code']),
+        'append': lambda self, lines, patch: self._patch_append(lines, patch['code']),
+        'delete_range': lambda self, lines, patch: self._patch_delete_range(lines, patch['start_line'], patch['end_line']),
+    }
+
     def _apply_single_patch(self, lines: List[str], patch: Dict[str, Any]) -> Tuple[bool, str]:
         """Apply a single patch to lines array"""
-        patch_type = patch['type']
+        # Reuse a pattern the caller already compiled, unless another backend is configured
+        compiled = patch.get('_compiled')
+        if compiled is not None and self.regex_backend == 're':
+            self._regex_cache.setdefault(compiled.pattern, compiled)
 
         try:
-            if patch_type == 'insert_at_line':
-                return self._patch_insert_at_line(lines, patch['line_number'], patch['code'])
-            elif patch_type == 'replace_range':
-                return self._patch_replace_range(lines, patch['start_line'], patch['end_line'], patch['code'])
-            elif patch_type == 'replace_pattern':
-                return self._patch_replace_pattern(lines, patch['pattern'], patch['code'], patch.get('match_line'))
-            elif patch_type == 'replace_pattern_all':
-                return self._patch_replace_pattern_all(lines, patch['pattern'], patch['code'])
-            elif patch_type == 'insert_after':
-                return self._patch_insert_after(lines, patch['after'], patch['code'])
-            elif patch_type == 'insert_before':
-                return self._patch_insert_before(lines, patch['before'], patch['code'])
-            elif patch_type == 'append':
-                return self._patch_append(lines, patch['code'])
-            elif patch_type == 'delete_range':
-                return self._patch_delete_range(lines, patch['start_line'], patch['end_line'])
-            else:
+            patch_type = patch['type']
+            handler = self._PATCH_HANDLERS.get(patch_type)
+            if handler is None:
                 return False, f"Unknown patch type: {patch_type}"
+            return handler(self, lines, patch)
         except Exception as e:
             return False, f"Error applying patch: {e}"
 
@@ -192,8 +293,7 @@ class PatchEngine:
         # Apply indentation to new code
         indented_code = self._apply_indentation(new_code, base_indentation)
 
-        for i, line in enumerate(indented_code):
-            lines.insert(insert_pos + i, line + '\n')
+        lines[insert_pos:insert_pos] = [line + '\n' for line in indented_code]
 
         return True, f"Inserted {len(new_code)} lines at line {line_number}"
 
@@ -205,12 +305,8 @@ class PatchEngine:
         # Apply indentation to new code
         indented_code = self._apply_indentation(new_code, base_indentation)
 
-        # Remove old lines
-        del lines[start_line-1:end_line]
-
-        # Insert new lines with proper newlines
-        for i, line in enumerate(indented_code):
-            lines.insert(start_line-1 + i, line + '\n')
+        # Swap the old lines for the new ones in a single slice assignment
+        lines[start_line-1:end_line] = [line + '\n' for line in indented_code]
 
         return True, f"Replaced lines {start_line}-{end_line} with {len(new_code)} lines"
 
@@ -229,9 +325,7 @@ class PatchEngine:
                 indented_code = self._apply_indentation(new_code, base_indentation)
 
                 # Replace single line with potentially multiple lines
-                del lines[line_idx]
-                for j, new_line in enumerate(indented_code):
-                    lines.insert(line_idx + j, new_line + '\n')
+                lines[line_idx:line_idx + 1] = [new_line + '\n' for new_line in indented_code]
                 return True, f"Replaced pattern at line {match_line}"
         else:
             # Find and replace first occurrence
@@ -242,9 +336,7 @@ class PatchEngine:
                     indented_code = self._apply_indentation(new_code, base_indentation)
 
                     # Replace single line with potentially multiple lines
-                    del lines[i]
-                    for j, new_line in enumerate(indented_code):
-                        lines.insert(i + j, new_line + '\n')
+                    lines[i:i + 1] = [new_line + '\n' for new_line in indented_code]
                     return True, f"Replaced pattern at line {i+1}"
 
         return False, f"Pattern not found: {pattern}"
@@ -255,28 +347,104 @@ class PatchEngine:
         if not regex:
             return False, f"Invalid regex pattern: {pattern}"
 
+        # Build the result in one pass instead of shifting the list at every match
         replacements = 0
-        i = 0
-        while i < len(lines):
-            if regex.search(lines[i]):
+        new_lines = []
+        for line in lines:
+            if regex.search(line):
                 # Detect indentation from current line
-                base_indentation = self._detect_line_indentation(lines[i])
+                base_indentation = self._detect_line_indentation(line)
                 indented_code = self._apply_indentation(new_code, base_indentation)
-
-                # Replace this occurrence
-                del lines[i]
-                for j, new_line in enumerate(indented_code):
-                    lines.insert(i + j, new_line + '\n')
+                new_lines.extend(new_line + '\n' for new_line in indented_code)
                 replacements += 1
-                i += len(indented_code)  # Skip the newly inserted lines
             else:
-                i += 1
+                new_lines.append(line)
 
         if replacements > 0:
+            lines[:] = new_lines
             return True, f"Replaced pattern at {replacements} locations"
         else:
             return False, f"Pattern not found: {pattern}"
 
+    def _patch_replace_patterns(self, lines: List[str], patches: List[Dict[str, Any]]) -> List[Tuple[bool, str]]:
+        """Apply several replace_pattern/replace_pattern_all patches in order with a single scan of the lines"""
+        results: List[Tuple[bool, str]] = [None] * len(patches)
+        active = []  # [result index, regex, code, replace every match]
+        for index, patch in enumerate(patches):
+            compiled = patch.get('_compiled') if self.regex_backend == 're' else None
+            regex = compiled or self._get_compiled_regex(patch.get('pattern', ''))
+            if regex:
+                active.append((index, regex, patch.get('code', []), patch['type'] == 'replace_pattern_all'))
+            else:
+                results[index] = (False, f"Invalid regex pattern: {patch.get('pattern', '')}")
+
+        # One alternation rejects untouched lines in a single search: the union the patches were
+        # compiled with at import if they share one, else one built here. Patterns with their
+        # own flags or that cannot be combined are tested one by one instead
+        prefilter = None
+        union = patches[0].get('_union') if self.regex_backend == 're' else None
+        if union is not None and all(patch.get('_union') is union for patch in patches):
+            prefilter = union.search  # A superset of these patterns, so a miss still rules every one out
+        elif all(isinstance(regex, re.Pattern) and regex.flags == re.UNICODE
+               and not self._UNCOMBINABLE.search(regex.pattern) for _, regex, _, _ in active):
+            try:
+                prefilter = re.compile('|'.join(f'(?:{regex.pattern})' for _, regex, _, _ in active)).search
+            except re.error:
+                pass
+        if prefilter is None:
+            regexes = [regex for _, regex, _, _ in active]
+            prefilter = lambda line: any(regex.search(line) for regex in regexes)
+
+        # Replacements only depend on the matched line and lines are visited top to bottom,
+        # so running each patch over a line's replacements reproduces applying the patches
+        # one after another: a first-match patch fires at the same topmost line it would
+        counts = [0] * len(active)
+        first_lines = [0] * len(active)
+        # Lines gained or lost so far by later patches, which had not run yet when patch k
+        # reported its line number in a one-at-a-time application
+        offsets = [0] * len(active)
+        new_lines = []
+        append = new_lines.append
+        detect_indentation = self._detect_line_indentation
+        apply_indentation = self._apply_indentation
+        for line in lines:
+            if not prefilter(line):
+                append(line)
+                continue
+
+            current = [line]
+            stage_sizes = []
+            for k, (_, regex, code, replace_all) in enumerate(active):
+                stage_sizes.append(len(current))
+                if counts[k] and not replace_all:
+                    continue
+
+                expanded = []
+                for piece in current:
+                    if (replace_all or not counts[k]) and regex.search(piece):
+                        if not counts[k]:
+                            first_lines[k] = len(new_lines) + offsets[k] + len(expanded) + 1
+                        indentation = detect_indentation(piece)
+                        expanded.extend(new_line + '\n' for new_line in apply_indentation(code, indentation))
+                        counts[k] += 1
+                    else:
+                        expanded.append(piece)
+                current = expanded
+
+            for k, size in enumerate(stage_sizes):
+                offsets[k] += size - len(current)
+            new_lines.extend(current)
+        lines[:] = new_lines
+
+        for (index, _, _, replace_all), count, first_line in zip(active, counts, first_lines):
+            if not count:
+                results[index] = (False, f"Pattern not found: {patches[index].get('pattern', '')}")
+            elif replace_all:
+                results[index] = (True, f"Replaced pattern at {count} locations")
+            else:
+                results[index] = (True, f"Replaced pattern at line {first_line}")
+        return results
+
     def _patch_insert_after(self, lines: List[str], pattern: str, new_code: List[str]) -> Tuple[bool, str]:
         """Insert code after pattern with context indentation"""
         regex = self._get_compiled_regex(pattern)
@@ -291,8 +459,7 @@ class PatchEngine:
                 base_indentation = self._detect_context_indentation(lines, insert_pos)
                 indented_code = self._apply_indentation(new_code, base_indentation)
 
-                for j, new_line in enumerate(indented_code):
-                    lines.insert(insert_pos + j, new_line + '\n')
+                lines[insert_pos:insert_pos] = [new_line + '\n' for new_line in indented_code]
                 return True, f"Inserted after pattern at line {i+1}"
 
         return False, f"Pattern not found: {pattern}"
@@ -309,8 +476,7 @@ class PatchEngine:
                 base_indentation = self._detect_context_indentation(lines, i)
                 indented_code = self._apply_indentation(new_code, base_indentation)
 
-                for j, new_line in enumerate(indented_code):
-                    lines.insert(i + j, new_line + '\n')
+                lines[i:i] = [new_line + '\n' for new_line in indented_code]
                 return True, f"Inserted before pattern at line {i+1}"
 
         return False, f"Pattern not found: {pattern}"
@@ -324,8 +490,7 @@ class PatchEngine:
 
         indented_code = self._apply_indentation(new_code, base_indentation)
 
-        for line in indented_code:
-            lines.append(line + '\n')
+        lines.extend(line + '\n' for line in indented_code)
 
         return True, f"Appended {len(new_code)} lines to end of file"
 
@@ -336,12 +501,11 @@ class PatchEngine:
 
     def _detect_line_indentation(self, line: str) -> str:
         """Detect indentation from a line"""
-        # Count leading spaces or tabs
-        if not line.strip():  # Empty line
+        # Leading whitespace, found by slicing rather than a regex match per line
+        stripped = line.lstrip()
+        if not stripped:  # Empty line
             return ""
-
-        match = re.match(r'^(\s*)', line)
-        return match.group(1) if match else ""
+        return line[:len(line) - len(stripped)]
 
     def _detect_context_indentation(self, lines: List[str], position: int) -> str:
         """Detect indentation from context around position"""
@@ -362,14 +526,8 @@ class PatchEngine:
         if not indentation:
             return code_lines
 
-        indented_lines = []
-        for line in code_lines:
-            if line.strip():  # Only indent non-empty lines
-                indented_lines.append(indentation + line)
-            else:
-                indented_lines.append(line)
-
-        return indented_lines
+        # Only indent non-empty lines
+        return [indentation + line if line.strip() else line for line in code_lines]
 
     def _generate_diff(self, original_lines: List[str], new_lines: List[str], file_path: str) -> List[str]:
         """Generate unified diff between original and new content"""
@@ -5,20 +5,27 @@ Multi-file operations and bulk processing
 """
 
 import os
+import re
 import fnmatch
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+from collections import deque
+from itertools import islice
+
+from utils import required_literal
 
 
 class BatchOperations:
     """Handles batch operations across multiple files"""
+
+    MAX_WORKERS = 16  # files patched concurrently; the work is mostly read/write syscalls
     
     def __init__(self, patch_engine, file_manager):
         self.patch_engine = patch_engine
         self.file_manager = file_manager
-        self.batch_history = []
+        self.batch_history = deque(maxlen=100)  # Last 100 batch operations
 
     def interactive_batch_menu(self):
         """Interactive menu for batch operations"""
@@ -92,7 +99,9 @@ class BatchOperations:
             
         # Preview matches
         print(f"\n🔍 Previewing matches...")
-        preview_results = self._preview_batch_changes(matching_files, search_pattern, replacement)
+        max_matches = 500
+        preview_results = self._preview_batch_changes(matching_files, search_pattern, replacement,
+                                                      max_matches=max_matches)
         
         total_matches = sum(len(files) for files in preview_results.values())
         if total_matches == 0:
@@ -100,6 +109,8 @@ class BatchOperations:
             return
             
         print(f"📊 Found {total_matches} total matches across {len(preview_results)} files")
+        if total_matches >= max_matches:
+            print(f"⚠️  Preview truncated at {max_matches} matches; more files may be changed")
         
         # Confirm application
         confirm = input("\n✅ Apply changes? (y/n): ").lower()
@@ -228,15 +239,12 @@ class BatchOperations:
             
         # Apply
         print(f"\n🔄 Applying patch...")
-        results = []
-        
-        for file_path in matching_files:
-            success, result = self.patch_engine.apply_patches(file_path, [patch_config])
-            results.append({
-                'file': file_path,
-                'success': success,
-                'result': result
-            })
+        outcomes = self.apply_parallel(matching_files, [patch_config])
+        results = [{
+            'file': file_path,
+            'success': success,
+            'result': result
+        } for file_path, (success, result) in zip(matching_files, outcomes)]
         
         # Show results
         successful = sum(1 for r in results if r['success'])
@@ -252,6 +260,13 @@ class BatchOperations:
             'total_files': len(matching_files)
         })
 
+    def apply_parallel(self, paths: List[str], patches: List[Dict[str, Any]]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """Apply the same patches to many files from a thread pool, returning results in path order"""
+        # Files are patched independently, so their reads and writes overlap. Threads rather than
+        # forked processes: forking while the cache warm-up and other pools run can inherit held locks
+        with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_WORKERS, len(paths)))) as executor:
+            return list(executor.map(lambda file_path: self.patch_engine.apply_patches(file_path, patches), paths))
+
     def _batch_analysis(self):
         """Analyze multiple files for patterns and statistics"""
         print(f"\n📊 BATCH ANALYSIS")
@@ -314,34 +329,54 @@ class BatchOperations:
                 print(f"  '{pattern}': {count} matches")
 
     def _find_files_by_patterns(self, patterns: List[str], base_dir: str) -> List[str]:
-        """Find files matching the given patterns"""
-        matching_files = []
+        """Find files matching the given patterns in a single traversal"""
+        matching_files = {}  # Insertion-ordered set
         base_dir = self.file_manager.resolve_path(base_dir)
-        
+        matcher = re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns)).match
+
+        for entry in self.file_manager.iter_files_with_suffixes(base_dir, self._pattern_suffixes(patterns)):
+            rel_path = os.path.relpath(entry.path, self.file_manager.base_path)
+
+            if matcher(os.path.normcase(rel_path)):
+                # Skip binary blobs before they get decoded and regex-scanned
+                if self.file_manager.is_binary_file(entry.path):
+                    continue
+                matching_files[rel_path] = None
+
+        return list(matching_files)
+
+    @staticmethod
+    def _pattern_suffixes(patterns: List[str]) -> Optional[Tuple[str, ...]]:
+        """File name suffixes every match must end with, or None when a pattern allows any name"""
+        if os.path.normcase('A') != 'A':
+            return None  # Case-insensitive names are left to the full pattern match
+        suffixes = set()
         for pattern in patterns:
-            for root, dirs, files in os.walk(base_dir):
-                # Filter hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, self.file_manager.base_path)
-                    
-                    if any(fnmatch.fnmatch(rel_path, pattern) for pattern in patterns):
-                        matching_files.append(rel_path)
-                        
-        return list(set(matching_files))  # Remove duplicates
+            name = pattern.rsplit('/', 1)[-1]
+            suffix = name[1:]
+            if not name.startswith('*') or not suffix or any(char in suffix for char in '*?['):
+                return None
+            suffixes.add(suffix)
+        return tuple(suffixes)
 
-    def _preview_batch_changes(self, files: List[str], search_pattern: str, replacement: str) -> Dict[str, List]:
-        """Preview changes without applying them"""
+    def _preview_batch_changes(self, files: List[str], search_pattern: str, replacement: str,
+                               max_matches: int = 500) -> Dict[str, List]:
+        """Preview changes without applying them, stopping once max_matches are found"""
         preview_results = {}
+        total = 0
         
+        anchor = required_literal(search_pattern).encode('utf-8')
         for file_path in files[:50]:  # Limit preview to 50 files
+            if total >= max_matches:
+                break
+            if not self._may_contain(file_path, anchor):
+                continue
             file_info = self.file_manager.get_file_info(file_path)
             if file_info:
                 matches = self.patch_engine.find_code_blocks(file_info, search_pattern)
                 if matches:
                     preview_results[file_path] = matches
+                    total += len(matches)
                     
         return preview_results
 
@@ -349,25 +384,64 @@ class BatchOperations:
         """Apply find and replace to multiple files"""
         results = []
         replacement_lines = replacement.split('\n') if '\n' in replacement else [replacement]
-        
-        for file_path in files:
-            patches = [{
-                'type': 'replace_pattern_all',
-                'pattern': search_pattern,
-                'code': replacement_lines,
-                'description': f'Batch find/replace: {search_pattern}'
-            }]
-            
-            success, result = self.patch_engine.apply_patches(file_path, patches)
-            results.append({
+
+        # Validate once up front instead of reporting the same error for every file
+        try:
+            re.compile(search_pattern)
+        except re.error:
+            return [{
                 'file': file_path,
-                'success': success,
-                'changes_applied': result.get('successful_patches', 0) if success else 0,
-                'result': result
-            })
-            
+                'success': False,
+                'changes_applied': 0,
+                'result': {"error": f"Invalid regex pattern: {search_pattern}"}
+            } for file_path in files]
+
+        if not files:
+            return results
+
+        # Every match contains this literal, so files without it are never decoded
+        anchor = required_literal(search_pattern).encode('utf-8')
+
+        # Each file is its own read/modify/write transaction, so the transactions overlap
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(files))) as executor:
+            outcomes = executor.map(lambda file_path: self._find_replace_in_file(file_path, search_pattern,
+                                                                                 replacement_lines, anchor),
+                                    files)
+            for file_path, (success, result) in zip(files, outcomes):
+                results.append({
+                    'file': file_path,
+                    'success': success,
+                    'changes_applied': result.get('successful_patches', 0) if success else 0,
+                    'result': result
+                })
+
         return results
 
+    def _may_contain(self, file_path: str, anchor: bytes) -> bool:
+        """False only when the file's bytes provably lack the anchor literal"""
+        if not anchor:
+            return True
+        mapped = self.file_manager.open_mmap(file_path)
+        if mapped is None:
+            return True  # Empty or unmappable files take the regular path
+        with mapped:
+            return mapped.find(anchor) != -1
+
+    def _find_replace_in_file(self, file_path: str, search_pattern: str,
+                              replacement_lines: List[str], anchor: bytes = b'') -> Tuple[bool, Dict[str, Any]]:
+        """Replace every match in one file through the patch engine, skipping files that lack the anchor"""
+        # Ruled out before the engine reads and hashes the file for validation
+        if not self._may_contain(file_path, anchor):
+            return False, {"error": f"Pattern not found: {search_pattern}"}
+
+        # The engine owns validation, the auto_backup setting and restore-on-write-failure
+        return self.patch_engine.apply_patches(file_path, [{
+            'type': 'replace_pattern_all',
+            'pattern': search_pattern,
+            'code': replacement_lines,
+            'description': f'Batch find/replace: {search_pattern}'
+        }])
+
     def _show_batch_results(self, results: List[Dict]):
         """Display batch operation results"""
         successful = sum(1 for r in results if r['success'])
@@ -391,7 +465,8 @@ class BatchOperations:
             return
             
         print(f"\n📋 BATCH OPERATION HISTORY")
-        for operation in self.batch_history[-10:]:  # Show last 10
+        recent = islice(reversed(self.batch_history), 10)  # Show last 10
+        for operation in reversed(list(recent)):
             print(f"\n⏰ {operation['timestamp']}")
             print(f"📝 Type: {operation['type']}")
             print(f"📊 Results: {operation.get('files_processed', 0)} files processed")
@@ -6,7 +6,9 @@ Advanced diff generation, preview, and patch file creation
 
 import difflib
 import os
-from typing import List, Dict, Any, Optional, Tuple
+import sys
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
 from pathlib import Path
 
 
@@ -16,6 +18,8 @@ class DiffEngine:
     def __init__(self, file_manager):
         self.file_manager = file_manager
         self.diff_cache = {}
+        self._patch_engine = None
+        self._sorted_patches_cache = None
 
     def generate_unified_diff(self, original_lines: List[str], modified_lines: List[str], 
                             fromfile: str, tofile: str, context_lines: int = 3) -> List[str]:
@@ -33,17 +37,15 @@ class DiffEngine:
     def generate_patch_file(self, original_file: str, modified_file: str, 
                           patch_file: str = None) -> Optional[str]:
         """Generate a standard patch file from two files"""
-        original_info = self.file_manager.get_file_info(original_file)
-        modified_info = self.file_manager.get_file_info(modified_file)
+        # read_file_lines keeps line endings, so lines feed the diff as-is
+        original_lines = self.file_manager.read_file_lines(original_file)
+        modified_lines = self.file_manager.read_file_lines(modified_file)
         
-        if not original_info or not modified_info:
+        if original_lines is None or modified_lines is None:
             return None
             
         if not patch_file:
             patch_file = f"{original_file}.patch"
-            
-        original_lines = [line + '\n' for line in original_info['line_list']]
-        modified_lines = [line + '\n' for line in modified_info['line_list']]
         
         diff = self.generate_unified_diff(
             original_lines, modified_lines, 
@@ -52,7 +54,9 @@ class DiffEngine:
         
         try:
             with open(patch_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(diff))
+                # Header lines come without a terminator (lineterm=''),
+                # content lines keep the newline read from the file
+                f.writelines(line if line.endswith('\n') else line + '\n' for line in diff)
             return patch_file
         except Exception as e:
             print(f"❌ Error writing patch file: {e}")
@@ -68,9 +72,7 @@ class DiffEngine:
         simulated_lines = original_lines.copy()
         
         # Sort patches in reverse order to avoid line number issues during simulation
-        sorted_patches = sorted(patches,
-                              key=lambda x: x.get('line_number', x.get('start_line', 0)),
-                              reverse=True)
+        sorted_patches = self._sorted_patches(patches)
         
         # Simulate applying patches
         successful_patches = 0
@@ -92,44 +94,38 @@ class DiffEngine:
     def display_side_by_side_diff(self, original_lines: List[str], modified_lines: List[str], 
                                 file_path: str, context_lines: int = 5):
         """Display side-by-side diff preview"""
-        print(f"\n🔍 SIDE-BY-SIDE DIFF PREVIEW: {file_path}")
-        print("=" * 100)
-        print(f"{'ORIGINAL':<50} | {'MODIFIED':<50}")
-        print("-" * 100)
+        rows = self._side_by_side_rows(original_lines, modified_lines)
         
-        # Create a differ that shows changes
+        output = [
+            f"\n🔍 SIDE-BY-SIDE DIFF PREVIEW: {file_path}",
+            "=" * 100,
+            f"{'ORIGINAL':<50} | {'MODIFIED':<50}",
+            "-" * 100
+        ]
+        # Display side by side (only the rows we show are ever built)
+        output.extend(f"{orig:<50} | {mod:<50}" for orig, mod in islice(rows, 50))  # Limit display
+        output.append("=" * 100)
+        output.append("Legend: 🔴 Removed  🟢 Added  ⚫ Changed")
+        self._write_output(output)
+
+    def _side_by_side_rows(self, original_lines: List[str],
+                           modified_lines: List[str]) -> Iterator[Tuple[str, str]]:
+        """Lazily yield (original, modified) display rows for a side-by-side diff"""
         differ = difflib.Differ()
-        diff = list(differ.compare(
+        diff = differ.compare(
             [line.rstrip('\n') for line in original_lines],
             [line.rstrip('\n') for line in modified_lines]
-        ))
-        
-        original_display = []
-        modified_display = []
+        )
         
         for line in diff:
             if line.startswith('  '):  # Unchanged
                 content = line[2:]
-                original_display.append(f"  {content}")
-                modified_display.append(f"  {content}")
+                yield f"  {content}", f"  {content}"
             elif line.startswith('- '):  # Removed
-                original_display.append(f"🔴 {line[2:]}")
-                modified_display.append(" " * 50)
+                yield f"🔴 {line[2:]}", " " * 50
             elif line.startswith('+ '):  # Added
-                original_display.append(" " * 50)
-                modified_display.append(f"🟢 {line[2:]}")
-            elif line.startswith('? '):  # Changes within line
-                # This would require more sophisticated handling
-                pass
-        
-        # Display side by side
-        for i in range(min(len(original_display), 50)):  # Limit display
-            orig = original_display[i] if i < len(original_display) else ""
-            mod = modified_display[i] if i < len(modified_display) else ""
-            print(f"{orig:<50} | {mod:<50}")
-        
-        print("=" * 100)
-        print("Legend: 🔴 Removed  🟢 Added  ⚫ Changed")
+                yield " " * 50, f"🟢 {line[2:]}"
+            # '? ' lines mark changes within a line and are not displayed
 
     def interactive_diff_menu(self, file_path: str, patches: List[Dict]):
         """Interactive diff preview menu"""
@@ -176,37 +172,50 @@ class DiffEngine:
         if not diff:
             print("❌ No differences to display")
             return
-            
-        print(f"\n📋 UNIFIED DIFF")
-        print("=" * 80)
         
-        for line in diff:
-            if line.startswith('---'):
-                print(f"🔴 {line}")
-            elif line.startswith('+++'):
-                print(f"🟢 {line}")
-            elif line.startswith('@'):
-                print(f"🔵 {line}")
-            elif line.startswith('-'):
-                print(f"🔴 {line}")
-            elif line.startswith('+'):
-                print(f"🟢 {line}")
-            else:
-                print(f"  {line}")
-                
-        print("=" * 80)
+        def render():
+            yield f"\n📋 UNIFIED DIFF"
+            yield "=" * 80
+            for line in diff:
+                if line.startswith('---'):
+                    yield f"🔴 {line}"
+                elif line.startswith('+++'):
+                    yield f"🟢 {line}"
+                elif line.startswith('@'):
+                    yield f"🔵 {line}"
+                elif line.startswith('-'):
+                    yield f"🔴 {line}"
+                elif line.startswith('+'):
+                    yield f"🟢 {line}"
+                else:
+                    yield f"  {line}"
+            yield "=" * 80
+        
+        self._write_output(render())
 
     def _display_modified_preview(self, modified_lines: List[str], file_path: str):
         """Display preview of modified file"""
-        print(f"\n📄 MODIFIED FILE PREVIEW: {file_path}")
-        print("=" * 80)
+        output = [f"\n📄 MODIFIED FILE PREVIEW: {file_path}", "=" * 80]
         
-        for i, line in enumerate(modified_lines[:30], 1):  # Show first 30 lines
-            print(f"{i:4d} │ {line.rstrip()}")
+        output.extend(f"{i:4d} │ {line.rstrip()}"
+                      for i, line in enumerate(islice(modified_lines, 30), 1))  # Show first 30 lines
             
         if len(modified_lines) > 30:
-            print(f"... and {len(modified_lines) - 30} more lines")
-        print("=" * 80)
+            output.append(f"... and {len(modified_lines) - 30} more lines")
+        output.append("=" * 80)
+        self._write_output(output)
+
+    def _write_output(self, lines: Iterable[str], chunk_size: int = 1000):
+        """Write display lines with one stdout write per chunk instead of one print per line"""
+        buffer = []
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) >= chunk_size:
+                sys.stdout.write("\n".join(buffer) + "\n")
+                buffer.clear()
+        if buffer:
+            sys.stdout.write("\n".join(buffer) + "\n")
+        sys.stdout.flush()
 
     def _generate_patch_file_interactive(self, file_path: str, patches: List[Dict]):
         """Interactive patch file generation"""
@@ -225,9 +234,7 @@ class DiffEngine:
             modified_lines = original_lines.copy()
             patch_engine = self._get_patch_engine()
             
-            sorted_patches = sorted(patches,
-                                  key=lambda x: x.get('line_number', x.get('start_line', 0)),
-                                  reverse=True)
+            sorted_patches = self._sorted_patches(patches)
             
             for patch in sorted_patches:
                 patch_engine._apply_single_patch(modified_lines, patch)
@@ -267,9 +274,25 @@ class DiffEngine:
     def _get_patch_engine(self):
         """Get a patch engine instance for simulation"""
         # This would normally come from dependency injection
-        # For now, create a minimal implementation
-        from core.patch_engine import PatchEngine
-        return PatchEngine(self.file_manager, None)
+        # For now, create a minimal implementation once and reuse it
+        if self._patch_engine is None:
+            from core.patch_engine import PatchEngine
+            self._patch_engine = PatchEngine(self.file_manager, None)
+        return self._patch_engine
+
+    def _sorted_patches(self, patches: List[Dict]) -> List[Dict]:
+        """Return patches ordered bottom-to-top, reusing the last ordering of the same queue"""
+        # The queue itself is left untouched since it is displayed in insertion order
+        identity = tuple(map(id, patches))
+        cached = self._sorted_patches_cache
+        if cached is not None and cached[0] is patches and cached[1] == identity:
+            return cached[2]
+
+        sorted_patches = sorted(patches,
+                                key=lambda x: x.get('line_number', x.get('start_line', 0)),
+                                reverse=True)
+        self._sorted_patches_cache = (patches, identity, sorted_patches)
+        return sorted_patches
 
     def calculate_change_statistics(self, original_lines: List[str], modified_lines: List[str]) -> Dict[str, int]:
         """Calculate statistics about changes"""
@@ -5,70 +5,420 @@ Undo/Redo functionality and change tracking
 """
 
 import os
+import errno
+import shutil
 import json
+import time
+import atexit
+import heapq
+import hashlib
+import types
 import pickle
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Deque
-from collections import deque
+from typing import List, Dict, Any, Optional, Iterator
+from collections import deque, OrderedDict
+from itertools import islice, repeat
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_now = datetime.now
+
+
+def _json_default(obj):
+    """Serialize read-only mappings as dicts and anything else as text"""
+    if isinstance(obj, types.MappingProxyType):
+        return dict(obj)
+    return str(obj)
+
+
+def _dumps(obj, pretty: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, default=_json_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Decode JSON bytes, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _Stack:
+    """Operation stubs stored as parallel columns rather than one dict per operation"""
+    
+    FIELDS = ('operation_id', 'timestamp', 'file_path', 'patch_count', 'descriptions')
+    
+    def __init__(self, rows=(), maxlen: Optional[int] = None):
+        self.maxlen = maxlen
+        self.operation_ids = deque(maxlen=maxlen)
+        self.timestamps = deque(maxlen=maxlen)
+        self.file_paths = deque(maxlen=maxlen)
+        self.patch_counts = deque(maxlen=maxlen)
+        self.descriptions = deque(maxlen=maxlen)
+        self._columns = (self.operation_ids, self.timestamps, self.file_paths,
+                         self.patch_counts, self.descriptions)
+        # Lowercased copies for search, derived once per stub
+        self.search_paths = deque(maxlen=maxlen)
+        self.search_descriptions = deque(maxlen=maxlen)
+        self.extend(rows)
+    
+    def extend(self, rows):
+        """Push several stubs onto the stack"""
+        for row in rows:
+            self.append(row)
+    
+    def append(self, row: Dict):
+        """Push a stub onto the stack"""
+        for field, column in zip(self.FIELDS, self._columns):
+            column.append(row[field])
+        self.search_paths.append(row['file_path'].lower())
+        self.search_descriptions.append('\n'.join(row['descriptions']).lower())
+    
+    def pop(self) -> Dict:
+        """Pop the newest stub off the stack"""
+        self.search_paths.pop()
+        self.search_descriptions.pop()
+        return dict(zip(self.FIELDS, [column.pop() for column in self._columns]))
+    
+    def clear(self):
+        """Remove all stubs"""
+        for column in self._columns:
+            column.clear()
+        self.search_paths.clear()
+        self.search_descriptions.clear()
+    
+    def __len__(self) -> int:
+        return len(self.operation_ids)
+    
+    def __getitem__(self, index: int) -> Dict:
+        return dict(zip(self.FIELDS, [column[index] for column in self._columns]))
+    
+    def __iter__(self) -> Iterator[Dict]:
+        for values in zip(*self._columns):
+            yield dict(zip(self.FIELDS, values))
+
 
 class PatchHistory:
     """Manages patch history with undo/redo capabilities"""
     
-    def __init__(self, file_manager, history_file: str = ".patch_history.json"):
+    # Rewrite the log once it holds this many times more records than live operations
+    COMPACT_FACTOR = 10
+    # Flush buffered log records after this many operations or seconds
+    FLUSH_EVERY_OPS = 10
+    FLUSH_INTERVAL = 5.0
+    # Number of full operation records kept in memory; the rest live on disk
+    HOT_OPERATIONS = 10
+    # Single JSON document written by earlier versions, migrated on first load
+    JSON_HISTORY_FILE = ".patch_history.json"
+    # Header identifying the pickled history log
+    LOG_MAGIC = b'PATCHHIST1\n'
+    
+    def __init__(self, file_manager, history_file: str = ".patch_history.pkl"):
         self.file_manager = file_manager
         self.history_file = history_file
-        self.undo_stack: Deque[Dict] = deque(maxlen=100)  # Last 100 operations
-        self.redo_stack: Deque[Dict] = deque(maxlen=100)
-        self.current_session = []
+        self._history_path: Path = Path(file_manager.base_path) / history_file
+        self._exists_on_disk: Optional[bool] = None  # unknown until first checked
+        self.undo_stack = _Stack(maxlen=100)  # Last 100 operations
+        self.redo_stack = _Stack(maxlen=100)
+        self.current_session = _Stack()
+        self._session_files = set()  # running totals for the session summary
+        self._session_patches = 0
+        self._log_fh = None
+        self._log_records = 0
+        self._pending_records: List[bytes] = []
+        self._dirty = False
+        self._ops_since_flush = 0
+        self._last_flush = time.monotonic()
+        self._hot: OrderedDict = OrderedDict()  # operation id -> full record
+        self._cold_dir = os.path.join(file_manager.base_path, '.patch_history_ops')
         
         self._load_history()
+        # atexit runs handlers last-in first-out: flush, then close
+        atexit.register(self._close_log)
+        atexit.register(self.flush)
 
     def _load_history(self):
-        """Load history from file"""
-        history_path = os.path.join(self.file_manager.base_path, self.history_file)
+        """Rebuild history by replaying the append-only log"""
+        if self._exists_on_disk is None:
+            self._exists_on_disk = self._history_path.exists()
+        
+        if self._exists_on_disk:
+            self._load_history_file(self._history_path)
+            return
+        
+        # Migrate a history file left behind by earlier versions
+        json_path = self._history_path.with_name(self.JSON_HISTORY_FILE)
+        if json_path != self._history_path and json_path.exists():
+            self._load_history_file(json_path)
+            self._save_history()
+
+    def _load_history_file(self, path: Path):
+        """Replay a pickled log, or read the tail of a legacy JSON document"""
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(self.LOG_MAGIC)) == self.LOG_MAGIC:
+                    self._replay_pickle_log(f)
+                    return
+                
+                f.seek(0)
+                self._load_legacy_document(_loads(f.read()))
+        except Exception as e:
+            print(f"⚠️  Error loading history: {e}")
+
+    def _replay_pickle_log(self, f):
+        """Replay pickled records until the end of the log"""
+        while True:
+            try:
+                record = pickle.load(f)
+            except EOFError:
+                break
+            except pickle.UnpicklingError as e:
+                print(f"⚠️  Ignoring truncated history record: {e}")
+                break
+            self._replay_record(record)
+            self._log_records += 1
+
+    def _load_legacy_document(self, history_data: Dict):
+        """Load only the operations that fit on the stacks from a legacy document"""
+        for key, stack in (('undo_stack', self.undo_stack), ('redo_stack', self.redo_stack)):
+            operations = history_data.get(key, [])
+            tail = islice(operations, max(0, len(operations) - stack.maxlen), None)
+            stack.clear()
+            stack.extend(map(self._as_stub, tail))
+
+    def _replay_record(self, record: Dict):
+        """Apply one log record to the in-memory stacks"""
+        kind = record.get('kind')
+        
+        if kind == 'snapshot':
+            self.undo_stack.clear()
+            self.undo_stack.extend(map(self._as_stub, record.get('undo_stack', [])))
+            self.redo_stack.clear()
+            self.redo_stack.extend(map(self._as_stub, record.get('redo_stack', [])))
+        elif kind == 'apply':
+            self.undo_stack.append(self._as_stub(record['op']))
+            self.redo_stack.clear()
+        elif kind == 'undo' and self.undo_stack:
+            self.redo_stack.append(self.undo_stack.pop())
+        elif kind == 'redo' and self.redo_stack:
+            self.undo_stack.append(self.redo_stack.pop())
+
+    def _append_record(self, op: Dict, kind: str):
+        """Queue a single record for the history log"""
+        try:
+            self._pending_records.append(pickle.dumps({'kind': kind, 'op': op},
+                                                      protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"⚠️  Error saving history: {e}")
+            return
         
-        if os.path.exists(history_path):
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        """Flush queued records once enough operations or time have accumulated"""
+        self._dirty = True
+        self._ops_since_flush += 1
+        
+        if (self._ops_since_flush >= self.FLUSH_EVERY_OPS or
+                time.monotonic() - self._last_flush > self.FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """Write queued records to the history log"""
+        if not self._dirty:
+            return
+        
+        data = b''.join(self._pending_records)
+        try:
             try:
-                with open(history_path, 'r') as f:
-                    history_data = json.load(f)
-                    self.undo_stack = deque(history_data.get('undo_stack', []), maxlen=100)
-                    self.redo_stack = deque(history_data.get('redo_stack', []), maxlen=100)
-            except Exception as e:
-                print(f"⚠️  Error loading history: {e}")
+                self._write_log(data)
+            except (OSError, ValueError) as e:
+                # The handle was closed underneath us; reopen once and retry
+                if isinstance(e, OSError) and e.errno != errno.EBADF:
+                    raise
+                self._log_fh = None
+                self._write_log(data)
+            self._log_records += len(self._pending_records)
+            self._exists_on_disk = True
+        except Exception as e:
+            print(f"⚠️  Error saving history: {e}")
+            return
+        
+        self._reset_pending()
+        
+        live_operations = len(self.undo_stack) + len(self.redo_stack)
+        if self._log_records > self.COMPACT_FACTOR * max(1, live_operations):
+            self.compact()
+
+    def _ensure_log_open(self):
+        """Open the long-lived append handle on first use"""
+        if self._log_fh is None:
+            self._log_fh = open(self._history_path, 'ab', buffering=1 << 16)
+            if self._log_fh.tell() == 0:
+                self._log_fh.write(self.LOG_MAGIC)
+
+    def _write_log(self, data: bytes):
+        """Append raw record bytes through the cached handle"""
+        self._ensure_log_open()
+        self._log_fh.write(data)
+        self._log_fh.flush()
 
-    def _save_history(self):
-        """Save history to file"""
-        history_path = os.path.join(self.file_manager.base_path, self.history_file)
+    def _reset_pending(self):
+        """Drop queued records and restart the flush window"""
+        self._pending_records.clear()
+        self._dirty = False
+        self._ops_since_flush = 0
+        self._last_flush = time.monotonic()
+
+    def _close_log(self):
+        """Close the cached log handle"""
+        if self._log_fh is not None:
+            try:
+                self._log_fh.close()
+            except Exception:
+                pass
+            self._log_fh = None
+
+    def _save_history(self, fsync: bool = False):
+        """Atomically rewrite the history log as a single snapshot record"""
+        self._close_log()
+        tmp_path = self._history_path.with_suffix(self._history_path.suffix + '.tmp')
         
         try:
-            with open(history_path, 'w') as f:
-                json.dump({
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                f.write(self.LOG_MAGIC)
+                pickle.dump({
+                    'kind': 'snapshot',
                     'undo_stack': list(self.undo_stack),
                     'redo_stack': list(self.redo_stack),
-                    'last_saved': datetime.now().isoformat()
-                }, f, indent=2)
+                    'last_saved': _now().isoformat()
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self._history_path)
+            self._log_records = 1
+            self._exists_on_disk = True
+            self._reset_pending()
         except Exception as e:
             print(f"⚠️  Error saving history: {e}")
 
+    def compact(self):
+        """Compact the append-only log down to the current state"""
+        self._save_history()
+
     def record_operation(self, file_path: str, patches: List[Dict], 
                         original_content: List[str], result: Dict):
         """Record a patch operation for undo capability"""
+        backup_file = result.get('backup_path', '')
+        has_backup = bool(backup_file) and os.path.isfile(backup_file)
+        now = _now()
         operation = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'file_path': file_path,
-            'patches_applied': patches.copy(),
-            'original_content': original_content.copy(),
-            'result': result.copy(),
-            'backup_file': result.get('backup_path', ''),
-            'operation_id': self._generate_operation_id()
+            'patches_applied': tuple(patches),
+            # The backup was just taken from the file, so its bytes are the pre-image undo must restore
+            'content_sha256': self._file_hash(backup_file) if has_backup else None,
+            'result': types.MappingProxyType(result),
+            'backup_file': backup_file,
+            'operation_id': self._generate_operation_id(now)
         }
         
-        self.undo_stack.append(operation)
-        self.current_session.append(operation)
+        # Only keep the content inline when there is no backup to reference
+        if not has_backup:
+            operation['original_content'] = original_content.copy()
+        
+        # Forget operations that are about to fall off either stack
+        if len(self.undo_stack) == self.undo_stack.maxlen:
+            self._discard_operation(self.undo_stack[0])
+        for dropped in self.redo_stack:
+            self._discard_operation(dropped)
+        
+        stub = self._store_operation(operation)
+        self.undo_stack.append(stub)
+        self.current_session.append(stub)
+        self._session_files.add(file_path)
+        self._session_patches += stub['patch_count']
         self.redo_stack.clear()  # Clear redo stack when new operation is recorded
-        self._save_history()
+        self._append_record(stub, 'apply')
+
+    def _make_stub(self, operation: Dict) -> Dict:
+        """Build the lightweight record kept on the undo/redo stacks"""
+        return {
+            'operation_id': operation['operation_id'],
+            'timestamp': operation['timestamp'],
+            'file_path': operation['file_path'],
+            'patch_count': len(operation['patches_applied']),
+            'descriptions': [patch.get('description', '') for patch in operation['patches_applied']]
+        }
+
+    def _as_stub(self, record: Dict) -> Dict:
+        """Turn a replayed record into a stub, paging out full legacy records"""
+        if 'patches_applied' in record:
+            return self._store_operation(record)
+        return record
+
+    def _store_operation(self, operation: Dict) -> Dict:
+        """Write the full record to the cold store and keep it hot"""
+        cold_record = dict(operation)
+        if isinstance(cold_record.get('result'), types.MappingProxyType):
+            cold_record['result'] = dict(cold_record['result'])
+        
+        try:
+            os.makedirs(self._cold_dir, exist_ok=True)
+            with open(self._cold_path(operation['operation_id']), 'wb') as f:
+                pickle.dump(cold_record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"⚠️  Error saving history: {e}")
+        
+        self._remember_hot(operation)
+        return self._make_stub(operation)
+
+    def _cold_path(self, operation_id: str) -> str:
+        """Get the cold store path for an operation"""
+        return os.path.join(self._cold_dir, f"{operation_id}.pkl")
+
+    def _remember_hot(self, operation: Dict):
+        """Keep a full record in the in-memory tier"""
+        self._hot[operation['operation_id']] = operation
+        self._hot.move_to_end(operation['operation_id'])
+        if len(self._hot) > self.HOT_OPERATIONS:
+            self._hot.popitem(last=False)
+
+    def _hydrate(self, stub: Dict) -> Optional[Dict]:
+        """Load the full record behind a stub"""
+        operation_id = stub['operation_id']
+        if operation_id in self._hot:
+            self._hot.move_to_end(operation_id)
+            return self._hot[operation_id]
+        
+        try:
+            with open(self._cold_path(operation_id), 'rb') as f:
+                operation = pickle.load(f)
+        except Exception as e:
+            print(f"❌ Error loading operation {operation_id}: {e}")
+            return None
+        
+        self._remember_hot(operation)
+        return operation
+
+    def _discard_operation(self, stub: Dict):
+        """Drop an operation from the cold store"""
+        self._hot.pop(stub['operation_id'], None)
+        try:
+            os.remove(self._cold_path(stub['operation_id']))
+        except OSError:
+            pass
 
     def undo_last_operation(self) -> bool:
         """Undo the last patch operation"""
@@ -81,14 +431,13 @@ class PatchHistory:
         print(f"\n↩️  UNDOING: {operation['file_path']}")
         print(f"⏰ Original operation: {operation['timestamp']}")
         
-        # Restore from backup if available
-        if operation['backup_file'] and os.path.exists(operation['backup_file']):
-            success = self.file_manager.restore_backup(operation['file_path'])
-            if success:
-                print("✅ Successfully undone using backup")
-                self.redo_stack.append(operation)
-                self._save_history()
-                return True
+        # Restore the content the file had before the operation
+        full_operation = self._hydrate(operation)
+        if full_operation is not None and self._restore_original(full_operation):
+            print("✅ Successfully undone using backup")
+            self.redo_stack.append(operation)
+            self._append_record({'operation_id': operation['operation_id']}, 'undo')
+            return True
         
         # If no backup, try to reverse patches
         print("⚠️  No backup available, attempting to reverse patches...")
@@ -98,6 +447,52 @@ class PatchHistory:
         print("❌ Automatic reversal not implemented. Please use backup restoration.")
         return False
 
+    @staticmethod
+    def _file_hash(path: str) -> Optional[str]:
+        """SHA-256 of a file's bytes, or None if it cannot be read"""
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _restore_original(self, operation: Dict) -> bool:
+        """Put a file back as it was before an operation, copying a verified backup byte for byte"""
+        if 'original_content' in operation:
+            return self.file_manager.write_file_lines(operation['file_path'], operation['original_content'])
+        
+        backup_file = self._verified_backup(operation)
+        if backup_file is None:
+            return False
+        
+        try:
+            shutil.copy2(backup_file, self.file_manager.resolve_path(operation['file_path']))
+            return True
+        except Exception as e:
+            print(f"❌ Restore failed: {e}")
+            return False
+
+    def _verified_backup(self, operation: Dict) -> Optional[str]:
+        """Path of a backup whose bytes hash to the content recorded before the operation"""
+        backup_file = operation.get('backup_file', '')
+        expected = operation.get('content_sha256')
+        if backup_file and os.path.isfile(backup_file):
+            if expected is None or self._file_hash(backup_file) == expected:
+                return backup_file
+        if expected is None:
+            return None
+        
+        # Backup names have one-second resolution and rotate, so the recorded one may hold other content
+        safe_path = operation['file_path'].replace('/', '__').replace('\\', '__')
+        backups = sorted(Path(self.file_manager.backup_dir).glob(f"{safe_path}.*.bak"),
+                         key=lambda backup: backup.stat().st_mtime, reverse=True)
+        for backup in backups:
+            if self._file_hash(str(backup)) == expected:
+                return str(backup)
+        
+        print("❌ No backup matches the content recorded before this operation")
+        return None
+
     def redo_operation(self) -> bool:
         """Redo the last undone operation"""
         if not self.redo_stack:
@@ -108,16 +503,21 @@ class PatchHistory:
         
         print(f"\n↪️  REDOING: {operation['file_path']}")
         
+        full_operation = self._hydrate(operation)
+        if full_operation is None:
+            print("❌ Failed to redo operation")
+            return False
+        
         # Re-apply the patches
         success, result = self.file_manager.patch_engine.apply_patches(
             operation['file_path'], 
-            operation['patches_applied']
+            full_operation['patches_applied']
         )
         
         if success:
             print("✅ Successfully redone")
             self.undo_stack.append(operation)
-            self._save_history()
+            self._append_record({'operation_id': operation['operation_id']}, 'redo')
             return True
         else:
             print("❌ Failed to redo operation")
@@ -175,12 +575,14 @@ class PatchHistory:
                 elif choice == '4':
                     self._clear_history()
                 elif choice == '0':
+                    self.flush()
                     break
                 else:
                     print("❌ Invalid choice or operation not available")
                     
             except KeyboardInterrupt:
                 print("\n⏹️  Operation cancelled.")
+                self.flush()
                 break
             except Exception as e:
                 print(f"❌ Error: {e}")
@@ -193,16 +595,21 @@ class PatchHistory:
         if not self.undo_stack and not self.redo_stack:
             print("❌ No history available")
             return
-            
-        all_operations = list(self.redo_stack) + list(self.undo_stack)
-        all_operations.sort(key=lambda x: x['timestamp'], reverse=True)
         
-        for i, operation in enumerate(all_operations[:20], 1):  # Show last 20
-            status = "🔴 UNDONE" if operation in self.redo_stack else "🟢 APPLIED"
-            print(f"\n{i}. {status} - {operation['timestamp']}")
-            print(f"   📄 File: {operation['file_path']}")
-            print(f"   🔧 Patches: {len(operation['patches_applied'])} applied")
-            print(f"   📝 Description: {operation['patches_applied'][0].get('description', 'No description') if operation['patches_applied'] else 'No patches'}")
+        def rows(stack: _Stack, status: str, order):
+            return zip(order(stack.timestamps), order(stack.file_paths),
+                       order(stack.patch_counts), order(stack.descriptions), repeat(status))
+        
+        # The undo stack is oldest first, while undo pushes each newer operation onto the redo stack
+        # first, so it already runs newest first; a lazy merge of both yields newest first
+        merged = heapq.merge(rows(self.undo_stack, "🟢 APPLIED", reversed), rows(self.redo_stack, "🔴 UNDONE", iter),
+                             key=lambda row: row[0], reverse=True)
+            
+        for i, (timestamp, file_path, patch_count, descriptions, status) in enumerate(islice(merged, 20), 1):  # Show last 20
+            print(f"\n{i}. {status} - {timestamp}")
+            print(f"   📄 File: {file_path}")
+            print(f"   🔧 Patches: {patch_count} applied")
+            print(f"   📝 Description: {(descriptions[0] or 'No description') if descriptions else 'No patches'}")
 
     def _clear_history(self):
         """Clear all history"""
@@ -211,14 +618,21 @@ class PatchHistory:
             self.undo_stack.clear()
             self.redo_stack.clear()
             self.current_session.clear()
+            self._session_files.clear()
+            self._session_patches = 0
+            self._hot.clear()
+            shutil.rmtree(self._cold_dir, ignore_errors=True)
             
             # Delete history file
-            history_path = os.path.join(self.file_manager.base_path, self.history_file)
+            self._close_log()
+            self._log_records = 0
+            self._reset_pending()
             try:
-                if os.path.exists(history_path):
-                    os.remove(history_path)
+                if self._exists_on_disk is not False:
+                    self._history_path.unlink()
             except:
                 pass
+            self._exists_on_disk = False
                 
             print("✅ History cleared")
         else:
@@ -227,27 +641,31 @@ class PatchHistory:
     def get_session_summary(self) -> Dict[str, Any]:
         """Get summary of current session"""
         return {
-            'session_start': self.current_session[0]['timestamp'] if self.current_session else None,
+            'session_start': self.current_session.timestamps[0] if self.current_session else None,
             'operations_count': len(self.current_session),
-            'files_modified': len(set(op['file_path'] for op in self.current_session)),
-            'total_patches': sum(len(op['patches_applied']) for op in self.current_session)
+            'files_modified': len(self._session_files),
+            'total_patches': self._session_patches
         }
 
-    def _generate_operation_id(self) -> str:
+    def _generate_operation_id(self, now: Optional[datetime] = None) -> str:
         """Generate a unique operation ID"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return (now or _now()).strftime("%Y%m%d_%H%M%S_%f")
 
-    def export_history(self, export_file: str = "patch_history_export.json") -> bool:
-        """Export history to file"""
+    def export_history(self, export_file: str = "patch_history_export.json", pretty: bool = False) -> bool:
+        """Export history to file, indented only when pretty is requested"""
+        export_data = {
+            'export_timestamp': _now().isoformat(),
+            'undo_stack': list(self.undo_stack),
+            'redo_stack': list(self.redo_stack),
+            'current_session': list(self.current_session),
+            'session_summary': self.get_session_summary()
+        }
+        
         try:
-            with open(export_file, 'w') as f:
-                json.dump({
-                    'export_timestamp': datetime.now().isoformat(),
-                    'undo_stack': list(self.undo_stack),
-                    'redo_stack': list(self.redo_stack),
-                    'current_session': self.current_session,
-                    'session_summary': self.get_session_summary()
-                }, f, indent=2, default=str)
+            encoded = _dumps(export_data, pretty=pretty)
+            
+            with open(export_file, 'wb', buffering=1 << 20) as f:
+                f.write(encoded)
             print(f"✅ History exported to {export_file}")
             return True
         except Exception as e:
@@ -257,14 +675,13 @@ class PatchHistory:
     def search_history(self, query: str) -> List[Dict]:
         """Search history by filename or patch description"""
         query = query.lower()
-        results = []
         
-        all_operations = list(self.redo_stack) + list(self.undo_stack)
+        results = []
+        for stack in (self.undo_stack, self.redo_stack):
+            # Substring scan of the lowercased search columns
+            matches = [query in file_path or query in descriptions
+                       for file_path, descriptions in zip(stack.search_paths, stack.search_descriptions)]
+            results.extend(stack[i] for i, matched in enumerate(matches) if matched)
         
-        for operation in all_operations:
-            if (query in operation['file_path'].lower() or
-                any(query in patch.get('description', '').lower() 
-                    for patch in operation['patches_applied'])):
-                results.append(operation)
-                
+        results.sort(key=lambda op: op['timestamp'], reverse=True)
         return results
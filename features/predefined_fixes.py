@@ -5,25 +5,109 @@ Advanced patch library and automated fixes
 """
 
 import os
-import json
-import glob
+import re
+import sys
+import pickle
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
-import importlib.util
-import inspect
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 from utils import RegexUtils, LineUtils, PatchValidator
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+class _LazyPatch(dict):
+    """Patch definition holding only summary fields until the rest is needed"""
+
+    def __init__(self, summary: Dict, loader: Callable[[], Dict]):
+        super().__init__(summary)
+        self._loader = loader
+
+    def _materialize(self):
+        """Load the full definition once"""
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            self.update(loader())
+
+    def __missing__(self, key):
+        if self._loader is None:
+            raise KeyError(key)
+        self._materialize()
+        return self[key]
+
+    def get(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self._materialize()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        if not dict.__contains__(self, key):
+            self._materialize()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._materialize()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def copy(self):
+        self._materialize()
+        return dict(dict.items(self))
+
 
 class PatchLibrary:
     """Manages a library of predefined patches with dynamic loading"""
 
+    # Per-file summaries and pickled definitions of external patches, so unchanged files need not be executed
+    INDEX_FILE = ".cache.pkl"
+    SUMMARY_FIELDS = ('name', 'description', 'category', 'severity')
+    # Metadata repeated across patches; loaded copies are interned so filters compare one shared string
+    INTERNED_FIELDS = ('category', 'severity', 'risk_level', 'author', 'version')
+
     def __init__(self, patches_dir: str = "patches/", regex_utils=None, line_utils=None):
         self.patches_dir = patches_dir
         self.regex_utils = regex_utils or RegexUtils()
         self.line_utils = line_utils or LineUtils()
         self.patches = {}
         self.categories = {}
+        self._search_index: Dict[str, str] = {}  # patch id -> casefolded "name\0description\0category"
+        self._by_category: Dict[str, Dict[str, Dict]] = {}
+        self._search_cached = lru_cache(maxsize=256)(self._search_ids)
         self._load_patch_library()
+        self._build_indexes()
 
     def _load_patch_library(self):
         """Load all patch definitions from patches directory"""
@@ -89,6 +173,7 @@ class PatchLibrary:
                             "type": "replace_pattern",
                             "pattern": r'def\s+(\w+)\s*\((.*?)\)\s*:',
                             "replacement": "def \\1(\\2) -> None:",
+                            "ast_transform": "AddTypeHints",
                             "context_aware": True
                         }
                     ],
@@ -140,30 +225,73 @@ class PatchLibrary:
         for category, patches in builtin_patches.items():
             self.categories[category] = category.replace('_', ' ').title()
             for patch_id, patch_def in patches.items():
+                self._prepare_patches(patch_def)
                 self.patches[patch_id] = patch_def
 
+    def _prepare_patches(self, patch_def: Dict):
+        """Intern shared metadata, precompile each pattern under '_compiled' and split its code under '_code_lines'"""
+        if not isinstance(patch_def, dict) or isinstance(patch_def, _LazyPatch):
+            return  # Lazy definitions are prepared when they are resolved
+
+        for field in self.INTERNED_FIELDS:
+            if isinstance(patch_def.get(field), str):
+                patch_def[field] = sys.intern(patch_def[field])
+
+        for patch in patch_def.get('patches', []):
+            if isinstance(patch.get('type'), str):
+                patch['type'] = sys.intern(patch['type'])
+
+            if '_code_lines' not in patch:
+                replacement = patch.get('replacement')
+                patch['_code_lines'] = replacement.split('\n') if isinstance(replacement, str) else patch.get('code', [])
+
+            pattern = patch.get('pattern')
+            if pattern and '_compiled' not in patch:
+                try:
+                    patch['_compiled'] = re.compile(pattern)
+                except re.error:
+                    pass  # Left for the patch engine to report
+
     def _load_external_patches(self):
         """Load patch definitions from external Python files"""
-        patch_files = glob.glob(os.path.join(self.patches_dir, "*.py"))
-        patch_files = [f for f in patch_files if not f.endswith('__init__.py')]
+        import inspect
+
+        # Private modules such as __init__.py are not patch files
+        with os.scandir(self.patches_dir) as entries:
+            patch_files = [entry.path for entry in entries
+                           if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('_')]
+
+        index = self._read_patch_index()
+        new_index = {}
 
         for patch_file in patch_files:
             try:
-                module_name = f"patch_{Path(patch_file).stem}"
-                # Skip if it's an __init__ file
-                if module_name == "patch___init__":
+                file_key = os.path.basename(patch_file)
+                stat = os.stat(patch_file)
+                signature = (stat.st_mtime_ns, stat.st_size)
+
+                # Unchanged file: register summaries, a definition is unpickled on first real use
+                entry = index.get(file_key)
+                if entry and entry.get('signature') == signature and not entry.get('eager'):
+                    for patch_id, (summary, blob) in entry.get('patches', {}).items():
+                        self.patches[patch_id] = _LazyPatch(summary, partial(self._load_cached_patch, blob))
+                    new_index[file_key] = entry
                     continue
 
-                spec = importlib.util.spec_from_file_location(
-                    f"patch_{Path(patch_file).stem}", patch_file
-                )
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
+                module = self._load_module(patch_file)
+                entry = {'signature': signature, 'patches': {}, 'eager': False}
+
                 # Look for PATCHES variable or class
                 if hasattr(module, 'PATCHES'):
                     for patch_id, patch_def in module.PATCHES.items():
+                        self._prepare_patches(patch_def)
                         self.patches[patch_id] = patch_def
+                        try:
+                            summary = {field: patch_def[field] for field in self.SUMMARY_FIELDS
+                                       if field in patch_def}
+                            entry['patches'][patch_id] = (summary, pickle.dumps(patch_def, pickle.HIGHEST_PROTOCOL))
+                        except Exception:
+                            entry['eager'] = True  # Not a plain dict of data, so the module must run each time
 
                 # Also look for patch classes
                 for name, obj in inspect.getmembers(module):
@@ -171,18 +299,84 @@ class PatchLibrary:
                         hasattr(obj, 'patch_id') and
                         hasattr(obj, 'apply')):
                         self.patches[obj.patch_id] = obj
+                        entry['eager'] = True  # Classes can only be found by running the module
+
+                new_index[file_key] = entry
                         
             except Exception as e:
                 print(f"⚠️  Error loading patch file {patch_file}: {e}")
 
+        if new_index != index:
+            self._write_patch_index(new_index)
+
+    def _load_module(self, patch_file: str):
+        """Execute an external patch file as a module"""
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(f"patch_{Path(patch_file).stem}", patch_file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    def _load_cached_patch(self, blob: bytes) -> Dict:
+        """Unpickle one cached definition, recompiling its patterns"""
+        patch_def = pickle.loads(blob)
+        self._prepare_patches(patch_def)
+        return patch_def
+
+    def _read_patch_index(self) -> Dict:
+        """Read the external patch cache"""
+        try:
+            with open(os.path.join(self.patches_dir, self.INDEX_FILE), 'rb') as f:
+                index = pickle.load(f)
+            return index if isinstance(index, dict) else {}
+        except Exception:
+            return {}  # Missing, stale or corrupt caches are simply rebuilt
+
+    def _write_patch_index(self, index: Dict):
+        """Write the external patch cache atomically"""
+        cache_path = os.path.join(self.patches_dir, self.INDEX_FILE)
+        tmp_path = cache_path + '.tmp'
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except (OSError, pickle.PicklingError) as e:
+            print(f"⚠️  Could not write patch cache: {e}")
+
+    def _build_indexes(self):
+        """Build the search index and category grouping from loaded patches"""
+        self._search_index.clear()
+        self._by_category.clear()
+        for patch_id, patch_def in self.patches.items():
+            self._index_patch(patch_id, patch_def)
+        self._search_cached.cache_clear()
+
+    def _index_patch(self, patch_id: str, patch_def: Dict):
+        """Add one patch to the search index and category grouping"""
+        if not isinstance(patch_def, dict):
+            return
+
+        # Drop a previous definition with the same id from its old category
+        for category_patches in self._by_category.values():
+            category_patches.pop(patch_id, None)
+
+        category = patch_def.get('category', '')
+        # NUL separators keep a match from spanning two fields
+        self._search_index[patch_id] = '\x00'.join((patch_def.get('name', ''),
+                                                    patch_def.get('description', ''),
+                                                    category)).casefold()
+        self._by_category.setdefault(category, {})[patch_id] = patch_def
+
     def get_categories(self) -> Dict[str, str]:
         """Get available patch categories"""
         return self.categories.copy()
 
     def get_patches_by_category(self, category: str) -> Dict[str, Dict]:
         """Get all patches in a category"""
-        return {pid: patch for pid, patch in self.patches.items()
-                if patch.get('category') == category}
+        return self._by_category.get(category, {})
 
     def get_patch(self, patch_id: str) -> Optional[Dict]:
         """Get a specific patch definition"""
@@ -190,16 +384,28 @@ class PatchLibrary:
 
     def search_patches(self, query: str) -> Dict[str, Dict]:
         """Search patches by name, description, or category"""
-        query = query.lower()
-        results = {}
-        
-        for patch_id, patch_def in self.patches.items():
-            if (query in patch_def.get('name', '').lower() or
-                query in patch_def.get('description', '').lower() or
-                query in patch_def.get('category', '').lower()):
-                results[patch_id] = patch_def
+        return {patch_id: self.patches[patch_id] for patch_id in self._search_cached(query.casefold())}
+
+    def _search_ids(self, query: str) -> Tuple[str, ...]:
+        """Find ids of patches whose casefolded fields contain every query term"""
+        terms = set(query.split())
+        if not terms:
+            return tuple(self._search_index)
+        if len(terms) > 1 and AHOCORASICK_AVAILABLE:
+            return self._search_ids_automaton(terms)
+
+        return tuple(patch_id for patch_id, blob in self._search_index.items()
+                     if all(term in blob for term in terms))
 
-        return results
+    def _search_ids_automaton(self, terms: set) -> Tuple[str, ...]:
+        """Match all terms with one Aho-Corasick scan per patch"""
+        automaton = ahocorasick.Automaton()
+        for term in terms:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+
+        return tuple(patch_id for patch_id, blob in self._search_index.items()
+                     if len({term for _, term in automaton.iter(blob)}) == len(terms))
 
     def create_custom_patch(self, name: str, description: str, patches: List[Dict],
                           category: str = "custom", **kwargs):
@@ -217,6 +423,9 @@ class PatchLibrary:
             "files": kwargs.get('files', ['**/*']),
             "dependencies": kwargs.get('dependencies', [])
         }
+        self._prepare_patches(self.patches[patch_id])
+        self._index_patch(patch_id, self.patches[patch_id])
+        self._search_cached.cache_clear()
 
         return patch_id
 
@@ -230,44 +439,80 @@ class PatchLibrary:
 
         filepath = os.path.join(self.patches_dir, filename)
 
+        # Prepared fields are rebuilt on load, and compiled patterns cannot be serialized
+        patch_def = dict(self.patches[patch_id])
+        patch_def['patches'] = [{key: value for key, value in patch.items() if not key.startswith('_')}
+                                for patch in patch_def.get('patches', [])]
+
         try:
-            with open(filepath, 'w') as f:
-                f.write(f'# Custom Patch: {self.patches[patch_id]["name"]}\n')
-                f.write(f'# Generated by Professional Patch Tool\n\n')
-                f.write('PATCHES = {\n')
-                f.write(f'    "{patch_id}": {json.dumps(self.patches[patch_id], indent=4)}\n')
-                f.write('}\n')
+            if ORJSON_AVAILABLE:
+                body = orjson.dumps(patch_def, option=orjson.OPT_INDENT_2)
+            else:
+                import json
+                body = json.dumps(patch_def, indent=2).encode('utf-8')
+
+            header = (f'# Custom Patch: {self.patches[patch_id]["name"]}\n'
+                      f'# Generated by Professional Patch Tool\n\n'
+                      f'PATCHES = {{\n    "{patch_id}": ').encode('utf-8')
+            with open(filepath, 'wb') as f:
+                f.write(header + body + b'\n}\n')
             return True
         except Exception as e:
             print(f"❌ Error saving patch: {e}")
             return False
 
 
+@lru_cache(maxsize=4)
+def _library_for(patches_dir: str) -> PatchLibrary:
+    """Shared PatchLibrary per absolute patches directory"""
+    return PatchLibrary(patches_dir)
+
+
 class PredefinedFixes:
     """Applies predefined fixes with advanced features"""
 
+    # Directories never searched for fix targets
+    SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.patch_backups',
+                 'venv', '.venv', 'dist', 'build'}
+    MAX_FILE_SIZE = 1024 * 1024  # larger files are generated or vendored, not worth fixing
+    MAX_WORKERS = 16  # threads applying a fix; the work is mostly file I/O
+    WARM_PATTERNS = ['**/*.py']  # target files discovered while the user reads the menu
+
     def __init__(self, patch_engine, file_manager, patch_library: PatchLibrary = None):
         self.patch_engine = patch_engine
         self.file_manager = file_manager
-        self.patch_library = patch_library or PatchLibrary()
+        self._patch_library = patch_library
+        self._patches_dir = os.path.abspath("patches/")
         self.applied_fixes = []
+        self._file_cache: Dict[Tuple, Tuple[Dict[str, int], List[str]]] = {}  # (base, patterns) -> (dir mtimes, files)
+        self._file_cache_lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+
+    @property
+    def patch_library(self) -> PatchLibrary:
+        """Patch library, loaded on first use rather than at construction"""
+        if self._patch_library is None:
+            self._patch_library = _library_for(self._patches_dir)
+        return self._patch_library
 
     def interactive_fixes_menu(self):
         """Interactive menu for applying predefined fixes"""
+        self._warm_file_cache()
+        categories = self.patch_library.get_categories()
+
         while True:
-            print(f"\n🛠️ PREDEFINED FIXES")
-            print("=" * 60)
+            buf = [f"\n🛠️ PREDEFINED FIXES", "=" * 60]
 
-            categories = self.patch_library.get_categories()
             for i, (cat_id, cat_name) in enumerate(categories.items(), 1):
                 patch_count = len(self.patch_library.get_patches_by_category(cat_id))
-                print(f"{i}. {cat_name} ({patch_count} fixes)")
+                buf.append(f"{i}. {cat_name} ({patch_count} fixes)")
             
-            print(f"{len(categories) + 1}. 🔍 Search fixes")
-            print(f"{len(categories) + 2}. 💾 Custom patches")
-            print(f"{len(categories) + 3}. 📊 Fix history")
-            print("0. ↩️  Back to main menu")
-            print("=" * 60)
+            buf.append(f"{len(categories) + 1}. 🔍 Search fixes")
+            buf.append(f"{len(categories) + 2}. 💾 Custom patches")
+            buf.append(f"{len(categories) + 3}. 📊 Fix history")
+            buf.append("0. ↩️  Back to main menu")
+            buf.append("=" * 60)
+            self._write_lines(buf)
 
             try:
                 choice = input("\nSelect category: ").strip()
@@ -283,6 +528,7 @@ class PredefinedFixes:
                         self._search_fixes()
                     elif choice_num == len(categories) + 2:
                         self._custom_patches_menu()
+                        categories = self.patch_library.get_categories()
                     elif choice_num == len(categories) + 3:
                         self._show_fix_history()
                     else:
@@ -304,18 +550,19 @@ class PredefinedFixes:
             print(f"❌ No fixes found in category: {category}")
             return
 
+        patch_list = list(patches.items())
+
         while True:
-            print(f"\n📁 {category.replace('_', ' ').title()} FIXES")
-            print("=" * 50)
+            buf = [f"\n📁 {category.replace('_', ' ').title()} FIXES", "=" * 50]
 
-            patch_list = list(patches.items())
             for i, (patch_id, patch_def) in enumerate(patch_list, 1):
                 severity_icon = self._get_severity_icon(patch_def.get('severity', 'medium'))
-                print(f"{i}. {severity_icon} {patch_def['name']}")
-                print(f"   📝 {patch_def['description']}")
+                buf.append(f"{i}. {severity_icon} {patch_def['name']}")
+                buf.append(f"   📝 {patch_def['description']}")
 
-            print("0. ↩️  Back")
-            print("=" * 50)
+            buf.append("0. ↩️  Back")
+            buf.append("=" * 50)
+            self._write_lines(buf)
 
             try:
                 choice = input("\nSelect fix to view details: ").strip()
@@ -337,26 +584,29 @@ class PredefinedFixes:
 
     def _show_fix_details(self, patch_id: str, patch_def: Dict):
         """Show detailed information about a fix"""
-        print(f"\n🔍 {patch_def['name']}")
-        print("=" * 60)
-        print(f"📝 Description: {patch_def['description']}")
-        print(f"📁 Category: {patch_def.get('category', 'uncategorized')}")
-        print(f"⚠️  Severity: {patch_def.get('severity', 'medium')}")
-        print(f"👤 Author: {patch_def.get('author', 'Unknown')}")
-        print(f"🔄 Version: {patch_def.get('version', '1.0')}")
-        print(f"📄 Files: {', '.join(patch_def.get('files', ['**/*']))}")
+        buf = [
+            f"\n🔍 {patch_def['name']}",
+            "=" * 60,
+            f"📝 Description: {patch_def['description']}",
+            f"📁 Category: {patch_def.get('category', 'uncategorized')}",
+            f"⚠️  Severity: {patch_def.get('severity', 'medium')}",
+            f"👤 Author: {patch_def.get('author', 'Unknown')}",
+            f"🔄 Version: {patch_def.get('version', '1.0')}",
+            f"📄 Files: {', '.join(patch_def.get('files', ['**/*']))}"
+        ]
 
         if patch_def.get('dependencies'):
-            print(f"📦 Dependencies: {', '.join(patch_def['dependencies'])}")
+            buf.append(f"📦 Dependencies: {', '.join(patch_def['dependencies'])}")
 
-        print(f"\n🔧 Patches to apply:")
+        buf.append(f"\n🔧 Patches to apply:")
         for i, patch in enumerate(patch_def.get('patches', []), 1):
-            print(f"  {i}. {patch.get('type', 'unknown')}: {patch.get('pattern', 'N/A')}")
+            buf.append(f"  {i}. {patch.get('type', 'unknown')}: {patch.get('pattern', 'N/A')}")
 
-        print("\n1. ✅ Apply this fix")
-        print("2. 🔍 Preview changes")
-        print("3. 💾 Save as custom patch")
-        print("0. ↩️  Back")
+        buf.append("\n1. ✅ Apply this fix")
+        buf.append("2. 🔍 Preview changes")
+        buf.append("3. 💾 Save as custom patch")
+        buf.append("0. ↩️  Back")
+        self._write_lines(buf)
         
         choice = input("\nSelect option: ").strip()
 
@@ -392,14 +642,16 @@ class PredefinedFixes:
             print("❌ Fix application cancelled")
             return False
 
-        # Apply patches to each file
-        success_count = 0
-        for file_path in target_files:
-            if self._apply_fix_to_file(file_path, patch_def):
-                success_count += 1
+        # Files are patched independently, so overlap their reads and writes
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(target_files))) as executor:
+            success_count = sum(executor.map(partial(self._apply_fix_to_file, patch_def=patch_def), target_files))
 
         print(f"\n🎉 Successfully applied fix to {success_count}/{len(target_files)} files")
 
+        # Applying a fix can add or remove files (e.g. backups), so rediscover next time
+        with self._file_cache_lock:
+            self._file_cache.clear()
+
         # Record the application
         self.applied_fixes.append({
             'patch_id': patch_id,
@@ -417,47 +669,131 @@ class PredefinedFixes:
         if not file_info:
             return False
 
-        # Validate patch before applying
-        validator = PatchValidator(self.patch_library.regex_utils)
-        for patch_config in patch_def.get('patches', []):
-            is_valid, message = validator.validate_patch(patch_config, file_info)
-            if not is_valid:
-                print(f"❌ Patch validation failed for {file_path}: {message}")
-                return False
-
         patches = []
         for patch_config in patch_def.get('patches', []):
             patches.append({
                 'type': patch_config['type'],
                 'pattern': patch_config.get('pattern', ''),
-                'code': patch_config.get('replacement', '').split('\n') if isinstance(patch_config.get('replacement'), str) else patch_config.get('code', []),
+                '_compiled': patch_config.get('_compiled'),
+                '_union': patch_config.get('_union'),
+                'ast_transform': patch_config.get('ast_transform'),
+                'code': patch_config.get('_code_lines', []),
                 'line_number': patch_config.get('line_number'),
                 'start_line': patch_config.get('start_line'),
                 'end_line': patch_config.get('end_line'),
                 'description': f"Predefined fix: {patch_def['name']}"
             })
 
+        # Validate the patches in the form the engine applies them, with 'code' split from 'replacement'
+        validator = PatchValidator(self.patch_library.regex_utils)
+        for patch in patches:
+            is_valid, message = validator.validate_patch(patch, file_info)
+            if not is_valid:
+                print(f"❌ Patch validation failed for {file_path}: {message}")
+                return False
+
         success, result = self.patch_engine.apply_patches(file_path, patches)
         return success
 
     def _find_target_files(self, file_patterns: List[str]) -> List[str]:
-        """Find files matching the given patterns"""
-        import fnmatch
-        
-        target_files = []
+        """Find files matching the given patterns, reusing results while no walked directory has changed"""
+        base_path = self.file_manager.base_path
+        key = (base_path, tuple(sorted(file_patterns)))
+
+        # A fix chosen during the background walk waits for it instead of walking twice
+        with self._file_cache_lock:
+            cached = self._file_cache.get(key)
+            if cached and self._directories_unchanged(cached[0]):
+                return cached[1]
+
+            try:
+                dir_mtimes = {base_path: os.stat(base_path).st_mtime_ns}
+            except OSError:
+                return []
+
+            target_files = self._walk_target_files(file_patterns, dir_mtimes)
+            self._file_cache[key] = (dir_mtimes, target_files)
+            return target_files
+
+    @staticmethod
+    def _directories_unchanged(dir_mtimes: Dict[str, int]) -> bool:
+        """Check that every walked directory still has its recorded mtime; one stat each, no listing"""
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes.items())
+        except OSError:
+            return False
+
+    def _warm_file_cache(self):
+        """Discover common fix targets in the background while the menu waits for input"""
+        if self._warm_thread and self._warm_thread.is_alive():
+            return
+
+        self._warm_thread = threading.Thread(target=self._find_target_files, args=(self.WARM_PATTERNS,),
+                                             name="fix-target-warmup", daemon=True)
+        self._warm_thread.start()
+
+    def _walk_target_files(self, file_patterns: List[str], dir_mtimes: Optional[Dict[str, int]] = None) -> List[str]:
+        """Walk the base directory for files matching the given patterns, recording subdirectory mtimes"""
+        target_files = set()
         base_path = self.file_manager.base_path
+        matches = self._path_matcher(file_patterns)
+
+        for root, dirs, files in os.walk(base_path):
+            dirs[:] = [d for d in dirs if d not in self.SKIP_DIRS]
+
+            # Taken before a subdirectory is listed, so a file added meanwhile still changes its mtime
+            if dir_mtimes is not None:
+                for d in dirs:
+                    try:
+                        dir_mtimes[os.path.join(root, d)] = os.stat(os.path.join(root, d)).st_mtime_ns
+                    except OSError:
+                        pass
+
+            for file in files:
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, base_path)
+                if not matches(rel_path):
+                    continue
 
-        for pattern in file_patterns:
-            # Simple glob pattern matching
-            for root, dirs, files in os.walk(base_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, base_path)
-                    
-                    if any(fnmatch.fnmatch(rel_path, pattern) for pattern in file_patterns):
-                        target_files.append(rel_path)
+                # Only matching files pay for a stat and a sniff for binary content
+                try:
+                    if os.stat(file_path, follow_symlinks=False).st_size > self.MAX_FILE_SIZE:
+                        continue
+                except OSError:
+                    continue
+                if self.file_manager.is_binary_file(rel_path):
+                    continue
+                target_files.add(rel_path)
 
-        return list(set(target_files))  # Remove duplicates
+        return sorted(target_files)
+
+    def _path_matcher(self, file_patterns: List[str]) -> Callable[[str], bool]:
+        """Build one test for all glob patterns, on Hyperscan when it is installed"""
+        import fnmatch
+
+        expressions = [fnmatch.translate(pattern) for pattern in file_patterns]
+
+        if HYPERSCAN_AVAILABLE:
+            try:
+                db = hyperscan.Database()
+                db.compile(expressions=[f'^{expression}'.encode() for expression in expressions],
+                           ids=list(range(len(expressions))),
+                           flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions))
+
+                def hs_matches(path: str) -> bool:
+                    found = []
+                    # A truthy handler result aborts the scan with ScanTerminated; SINGLEMATCH
+                    # already reports each pattern at most once
+                    db.scan(path.encode('utf-8', 'surrogateescape'),
+                            match_event_handler=lambda *args: found.append(True))
+                    return bool(found)
+
+                return hs_matches
+            except Exception:
+                pass  # Patterns Hyperscan cannot compile fall back to re
+
+        # One alternation of all glob patterns, tested once per file
+        return re.compile('|'.join(f'(?:{expression})' for expression in expressions)).match
 
     def _preview_fix(self, patch_id: str, patch_def: Dict):
         """Preview changes without applying"""
@@ -474,7 +810,7 @@ class PredefinedFixes:
                 for patch_config in patch_def.get('patches', []):
                     matches = self.patch_engine.find_code_blocks(
                         file_info,
-                        patch_config.get('pattern', ''),
+                        patch_config.get('_compiled') or patch_config.get('pattern', ''),
                         context_lines=2
                     )
                     if matches:
@@ -562,8 +898,7 @@ class PredefinedFixes:
 
     def _list_custom_patches(self):
         """List all custom patches"""
-        custom_patches = {pid: patch for pid, patch in self.patch_library.patches.items()
-                         if patch.get('category') == 'custom'}
+        custom_patches = self.patch_library.get_patches_by_category('custom')
         
         if not custom_patches:
             print("❌ No custom patches found")
@@ -585,6 +920,11 @@ class PredefinedFixes:
             print(f"  • {fix['timestamp']}: {fix['name']}")
             print(f"    Files: {fix['files_affected']}/{fix['total_files']}")
 
+    def _write_lines(self, lines: List[str]):
+        """Write a whole menu with one stdout write instead of one print per line"""
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
     def _get_severity_icon(self, severity: str) -> str:
         """Get icon for severity level"""
         icons = {
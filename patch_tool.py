@@ -8,18 +8,15 @@ import os
 import sys
 import re
 import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from utils import RegexUtils, FuzzyMatcher, LineUtils, Validation, PatchValidator
-from patches import PATCHES
 
 # Import core modules
 from core import ConfigManager, FileManager, NavigationSystem, PatchEngine
 
 # Import features modules
-from features import PatchLibrary, PredefinedFixes, BatchOperations, DiffEngine, PatchHistory
-
-# Import UI modules
-from ui import MainMenu, SyntaxHighlighter, PreviewRenderer
+from features import PredefinedFixes, BatchOperations, DiffEngine, PatchHistory
 
 
 class ProfessionalPatchTool:
@@ -33,14 +30,13 @@ class ProfessionalPatchTool:
         self.navigation = NavigationSystem(self.file_manager, self.config_manager)
         self.patch_engine = PatchEngine(self.file_manager, self.config_manager)
         
-        # Initialize UI modules
-        self.syntax_highlighter = SyntaxHighlighter(self.config_manager)
-        self.preview_renderer = PreviewRenderer(self.syntax_highlighter, self.config_manager)
-        self.main_menu = MainMenu(self)
+        # UI modules are created on first use, so scripted runs never import them
+        self._syntax_highlighter = None
+        self._preview_renderer = None
+        self._main_menu = None
         
         # Initialize features modules
-        self.patch_library = PatchLibrary()
-        self.predefined_fixes = PredefinedFixes(self.patch_engine, self.file_manager, self.patch_library)
+        self.predefined_fixes = PredefinedFixes(self.patch_engine, self.file_manager)
         self.batch_operations = BatchOperations(self.patch_engine, self.file_manager)
         self.diff_engine = DiffEngine(self.file_manager)
         self.patch_history = PatchHistory(self.file_manager)
@@ -59,9 +55,41 @@ class ProfessionalPatchTool:
         self.line_utils = LineUtils() 
         self.validation = Validation()
         self.patch_validator = PatchValidator(self.regex_utils)
-    
-        # Load patches library
-        self.patches_library = PATCHES
+
+    @property
+    def patch_library(self):
+        """Patch library, loaded by the predefined fixes on first use"""
+        return self.predefined_fixes.patch_library
+
+    @property
+    def syntax_highlighter(self):
+        """Syntax highlighter, imported and created on first use"""
+        if self._syntax_highlighter is None:
+            from ui import SyntaxHighlighter
+            self._syntax_highlighter = SyntaxHighlighter(self.config_manager)
+        return self._syntax_highlighter
+
+    @property
+    def preview_renderer(self):
+        """Preview renderer, imported and created on first use"""
+        if self._preview_renderer is None:
+            from ui import PreviewRenderer
+            self._preview_renderer = PreviewRenderer(self.syntax_highlighter, self.config_manager)
+        return self._preview_renderer
+
+    @property
+    def main_menu(self):
+        """Main menu, imported and created when the interactive session starts"""
+        if self._main_menu is None:
+            from ui import MainMenu
+            self._main_menu = MainMenu(self)
+        return self._main_menu
+
+    @property
+    def patches_library(self) -> Dict[str, Dict]:
+        """Bundled patch definitions, imported on first use"""
+        from patches import PATCHES
+        return PATCHES
 
     # Delegate methods to core modules for backward compatibility
     def _load_config(self) -> Dict[str, Any]:
@@ -80,7 +108,12 @@ class ProfessionalPatchTool:
         return self.navigation.navigate_to_file()
 
     def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
-        return self.file_manager.get_file_info(file_path)
+        """File info, reused while the file's mtime and size are unchanged"""
+        try:
+            stat = os.stat(self.file_manager.resolve_path(file_path))
+        except OSError:
+            return self.file_manager.get_file_info(file_path)
+        return _cached_file_info(self.file_manager, file_path, stat.st_mtime_ns, stat.st_size)
 
     def _detect_language(self, file_path: str) -> str:
         return self.file_manager._detect_language(file_path)
@@ -130,15 +163,18 @@ class ProfessionalPatchTool:
                 print("❌ Patch application cancelled")
                 return False
 
+        # Read before applying, so history records the content the patches replaced
+        original_content = self.file_manager.read_file_lines(file_path)
+        
         # Use the patch engine to apply patches
         success, result = self.patch_engine.apply_patches(file_path, patches)
         
         if success:
+            _cached_file_info.cache_clear()
             print(f"\n🎉 Successfully applied {result['successful_patches']}/{len(patches)} patches")
             print(f"📊 File changed: {result['original_lines']} → {result['new_lines']} lines")
             
             # Record in history
-            original_content = self.file_manager.read_file_lines(file_path)
             if original_content:
                 self.patch_history.record_operation(file_path, patches, original_content, result)
             
@@ -188,8 +224,7 @@ class ProfessionalPatchTool:
         
         # Main application loop
         try:
-            while True:
-                choice = self.main_menu.show_main_menu()
+            for choice in self.main_menu:
                 if not self.main_menu.handle_main_choice(choice):
                     break
                     
@@ -207,6 +242,18 @@ def main():
     tool.run()
 
 
+@lru_cache(maxsize=128)
+def _cached_file_info(file_manager: FileManager, file_path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    """Read file info once per (path, mtime, size); a rewrite changes the key"""
+    return file_manager.get_file_info(file_path)
+
+
+@lru_cache(maxsize=256)
+def _compiled(pattern: str) -> re.Pattern:
+    """Compile a fix pattern once for the lifetime of the tool"""
+    return re.compile(pattern)
+
+
 # Predefined fixes functions (kept for compatibility)
 def apply_predefined_fixes(tool: ProfessionalPatchTool):
     """Apply predefined fixes for common issues"""
@@ -277,10 +324,12 @@ def add_missing_function(tool: ProfessionalPatchTool, file_path: str) -> bool:
 
 def fix_syntax_error(tool: ProfessionalPatchTool, file_path: str) -> bool:
     """Example fix: Fix common syntax errors"""
+    pattern = r'print\s*\(.*[^)]$'
     patches = [
         {
             'type': 'replace_pattern',
-            'pattern': r'print\s*\(.*[^)]$',
+            'pattern': pattern,
+            '_compiled': _compiled(pattern),
             'code': ['print("Fixed syntax error")'],
             'description': 'Fix incomplete print statement'
         }
@@ -295,10 +344,12 @@ def fix_syntax_error(tool: ProfessionalPatchTool, file_path: str) -> bool:
 
 def update_configuration(tool: ProfessionalPatchTool, file_path: str) -> bool:
     """Example fix: Update configuration values"""
+    pattern = r'"timeout":\s*\d+'
     patches = [
         {
             'type': 'replace_pattern',
-            'pattern': r'"timeout":\s*\d+',
+            'pattern': pattern,
+            '_compiled': _compiled(pattern),
             'code': ['    "timeout": 30'],
             'description': 'Update timeout value to 30 seconds'
         }
@@ -4,15 +4,78 @@ Patches module for Professional Patch Tool
 User-defined patch library and automated fixes
 """
 
-from .security_fixes import SECURITY_PATCHES
-from .code_style import CODE_STYLE_PATCHES
-from .migration_scripts import MIGRATION_PATCHES
-
-# Combined patches dictionary
-PATCHES = {}
-PATCHES.update(SECURITY_PATCHES)
-PATCHES.update(CODE_STYLE_PATCHES)
-PATCHES.update(MIGRATION_PATCHES)
+import re
+import sys
+import importlib
+from collections import ChainMap
+from types import MappingProxyType
+
+# Patch modules are only imported when their patches are first accessed (PEP 562)
+_LAZY = {
+    'SECURITY_PATCHES': '.security_fixes',
+    'CODE_STYLE_PATCHES': '.code_style',
+    'MIGRATION_PATCHES': '.migration_scripts',
+}
+
+
+# Enumerated fields repeated across many patches; interned so every patch shares one string
+_INTERNED_FIELDS = ('category', 'severity', 'risk_level', 'author', 'version')
+
+
+# Patterns repeated across patch modules share one compiled object; unlike re's own
+# cache this one never evicts, so every patch keeps pointing at the same Pattern
+_RE_CACHE = {}
+
+
+def compile_shared(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile a pattern once per (pattern, flags) across all patch modules"""
+    key = (pattern, flags)
+    compiled = _RE_CACHE.get(key)
+    if compiled is None:
+        compiled = _RE_CACHE[key] = re.compile(pattern, flags)
+    return compiled
+
+
+def _compile_patches(patches: dict):
+    """Precompile each sub-patch's regex once, kept under '_compiled' beside the string form"""
+    for patch_def in patches.values():
+        for field in _INTERNED_FIELDS:
+            if isinstance(patch_def.get(field), str):
+                patch_def[field] = sys.intern(patch_def[field])
+
+        for sub_patch in patch_def.get('patches', []):
+            if isinstance(sub_patch.get('type'), str):
+                sub_patch['type'] = sys.intern(sub_patch['type'])
+
+            # insert_after/insert_before match on their anchor rather than 'pattern'
+            pattern = sub_patch.get('pattern') or sub_patch.get('after') or sub_patch.get('before')
+            if pattern and '_compiled' not in sub_patch:
+                try:
+                    sub_patch['_compiled'] = compile_shared(pattern)
+                except re.error:
+                    pass  # Left for the patch engine to report
+
+
+def _combine_patches() -> MappingProxyType:
+    """Combined patches view, read-only once prepared"""
+    # A view over the module dicts rather than a copy; later modules win, as with dict.update
+    combined = ChainMap(*(__getattr__(name) for name in reversed(tuple(_LAZY))))
+    _compile_patches(combined)
+    return MappingProxyType(combined)
+
+
+def __getattr__(name: str):
+    """Import patch modules and build PATCHES on first access"""
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    elif name == 'PATCHES':
+        value = _combine_patches()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'SECURITY_PATCHES',
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Test cases for security patches
+Kept out of security_fixes so importing the patches does not build them
+"""
+
+TEST_CASES = {
+    "fix_sql_injection": (
+        {
+            "input": "cursor.execute(\"SELECT * FROM users WHERE id = %s\" % user_id)",
+            "expected": "cursor.execute(\"SELECT * FROM users WHERE id = ?\", user_id)"
+        },
+    ),
+    "fix_hardcoded_secrets": (
+        {
+            "input": "api_key = \"sk_1234567890abcdef\"",
+            "expected": "api_key = os.getenv('API_KEY', '')"
+        },
+    ),
+}
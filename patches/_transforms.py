@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Syntax-tree transforms for Python patches
+libcst-based alternatives to regex patches, applied over a single parse per file
+"""
+
+import re
+from typing import List, Tuple
+
+try:
+    import libcst as cst
+    from libcst.helpers import get_full_name_for_node
+    LIBCST_AVAILABLE = True
+except ImportError:
+    LIBCST_AVAILABLE = False
+
+
+TRANSFORMS = {}
+
+if LIBCST_AVAILABLE:
+
+    class _ReturnsValue(cst.CSTVisitor):
+        """Find `return <expr>` or yield in a function body, not counting nested scopes"""
+
+        def __init__(self):
+            super().__init__()
+            self.found = False
+
+        def visit_FunctionDef(self, node):
+            return False
+
+        def visit_ClassDef(self, node):
+            return False
+
+        def visit_Lambda(self, node):
+            return False
+
+        def visit_Return(self, node):
+            if node.value is not None:
+                self.found = True
+
+        def visit_Yield(self, node):
+            self.found = True
+
+    class AddTypeHints(cst.CSTTransformer):
+        """Annotate functions that never return a value as returning None"""
+
+        def __init__(self):
+            super().__init__()
+            self.changes = 0
+
+        def leave_FunctionDef(self, original_node, updated_node):
+            if updated_node.returns is not None:
+                return updated_node
+
+            # Functions returning a value, and generators, are not None-returning
+            finder = _ReturnsValue()
+            updated_node.body.visit(finder)
+            if finder.found:
+                return updated_node
+
+            self.changes += 1
+            return updated_node.with_changes(returns=cst.Annotation(annotation=cst.Name("None")))
+
+    class AddDocstrings(cst.CSTTransformer):
+        """Give functions and classes without a docstring a one-line placeholder"""
+
+        def __init__(self):
+            super().__init__()
+            self.changes = 0
+
+        def _with_docstring(self, node, kind: str):
+            if node.get_docstring() is not None or not isinstance(node.body, cst.IndentedBlock):
+                return node
+            self.changes += 1
+            docstring = cst.SimpleStatementLine(body=[cst.Expr(cst.SimpleString(f'"""{node.name.value} {kind}."""'))])
+            return node.with_changes(body=node.body.with_changes(body=[docstring, *node.body.body]))
+
+        def leave_FunctionDef(self, original_node, updated_node):
+            return self._with_docstring(updated_node, "function")
+
+        def leave_ClassDef(self, original_node, updated_node):
+            return self._with_docstring(updated_node, "class")
+
+    # Identifiers inside a string annotation such as "typing.List[int]"
+    _ANNOTATION_NAME = re.compile(r'[A-Za-z_]\w*')
+
+    class _NameCollector(cst.CSTVisitor):
+        """Collect every name referenced outside import statements, string annotations included"""
+
+        def __init__(self):
+            super().__init__()
+            self.names = set()
+            self.exports = False
+            self._annotation_depth = 0
+
+        def visit_Import(self, node):
+            return False
+
+        def visit_ImportFrom(self, node):
+            return False
+
+        def visit_Name(self, node):
+            self.names.add(node.value)
+            if node.value == '__all__':
+                self.exports = True
+
+        def visit_Annotation(self, node):
+            self._annotation_depth += 1
+
+        def leave_Annotation(self, original_node):
+            self._annotation_depth -= 1
+
+        def visit_SimpleString(self, node):
+            if self._annotation_depth:
+                self.names.update(_ANNOTATION_NAME.findall(node.evaluated_value))
+
+    class RemoveUnusedImports(cst.CSTTransformer):
+        """Drop plain `import x` names the module never references"""
+
+        def __init__(self):
+            super().__init__()
+            self.changes = 0
+            self.used = set()
+            self.skip = False
+
+        def visit_Module(self, node):
+            collector = _NameCollector()
+            node.visit(collector)
+            self.used = collector.names
+            self.skip = collector.exports  # Names listed in __all__ are re-exports
+
+        def leave_Import(self, original_node, updated_node):
+            if self.skip:
+                return updated_node
+
+            kept = [alias for alias in updated_node.names if self._bound_name(alias) in self.used]
+            if len(kept) == len(updated_node.names):
+                return updated_node
+
+            self.changes += len(updated_node.names) - len(kept)
+            if not kept:
+                return cst.RemoveFromParent()
+            kept[-1] = kept[-1].with_changes(comma=cst.MaybeSentinel.DEFAULT)
+            return updated_node.with_changes(names=kept)
+
+        @staticmethod
+        def _bound_name(alias) -> str:
+            if alias.asname is not None:
+                return alias.asname.name.value
+            return get_full_name_for_node(alias.name).split('.')[0]
+
+    TRANSFORMS.update({
+        "AddTypeHints": AddTypeHints,
+        "AddDocstrings": AddDocstrings,
+        "RemoveUnusedImports": RemoveUnusedImports,
+    })
+
+
+def run_transforms(source: str, names: List[str]) -> Tuple[str, List[int]]:
+    """Parse source once, run the named transforms in order and return the new source with per-transform change counts"""
+    module = cst.parse_module(source)
+    counts = []
+    for name in names:
+        transformer = TRANSFORMS[name]()
+        module = module.visit(transformer)
+        counts.append(transformer.changes)
+    return module.code, counts
@@ -17,6 +17,7 @@ CODE_STYLE_PATCHES = {
                 "type": "replace_pattern",
                 "pattern": r'def\s+(\w+)\s*\((.*?)\)\s*:',
                 "replacement": "def \\1(\\2) -> None:",
+                "ast_transform": "AddTypeHints",
                 "context_aware": True,
                 "parameters": {
                     "return_type": {
@@ -115,6 +116,7 @@ CODE_STYLE_PATCHES = {
             {
                 "type": "insert_after",
                 "after": r'def\s+(\w+)\s*\((.*?)\)\s*:',
+                "ast_transform": "AddDocstrings",
                 "replacement": "    \"\"\"\\1 function.\n    \n    Args:\n        \\2: Function arguments\n        \n    Returns:\n        None\n    \"\"\"",
                 "parameters": {
                     "function_name": {
@@ -128,6 +130,7 @@ CODE_STYLE_PATCHES = {
             {
                 "type": "insert_after", 
                 "after": r'class\s+(\w+)\s*:',
+                "ast_transform": "AddDocstrings",
                 "replacement": "    \"\"\"\\1 class.\n    \n    Attributes:\n        None\n    \"\"\"",
                 "parameters": {
                     "class_name": {
@@ -155,6 +158,7 @@ CODE_STYLE_PATCHES = {
             {
                 "type": "replace_pattern", 
                 "pattern": r'^import\s+(\w+)$',
+                "ast_transform": "RemoveUnusedImports",
                 "replacement": "# import \\1  # UNUSED",
                 "parameters": {
                     "detect_unused": {
@@ -4,6 +4,15 @@ Security Fixes for Professional Patch Tool
 Security-related patches and vulnerability fixes
 """
 
+import re
+import sys
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
 SECURITY_PATCHES = {
     "fix_sql_injection": {
         "name": "SQL Injection Protection",
@@ -15,8 +24,9 @@ SECURITY_PATCHES = {
         "patches": [
             {
                 "type": "replace_pattern",
-                "pattern": r"cursor\.execute\(\s*[\"'](.*?\%s.*?)[\"']\s*%\s*(.*?)\s*\)",
-                "replacement": "cursor.execute(\"\\1\", \\2)",
+                # One negated class per quote style instead of nested .*?, so a line is matched without backtracking
+                "pattern": r"""cursor\.execute\(\s*(?:"([^"\n]*%s[^"\n]*)"|'([^'\n]*%s[^'\n]*)')\s*%\s*([^)\n]*[^)\s])\s*\)""",
+                "replacement": "cursor.execute(\"\\1\\2\", \\3)",
                 "validation": "sql_safe",
                 "parameters": {
                     "pattern": {
@@ -31,8 +41,8 @@ SECURITY_PATCHES = {
             },
             {
                 "type": "replace_pattern", 
-                "pattern": r"cursor\.execute\(\s*f[\"'](.*?)\[\"']\s*\)",
-                "replacement": "cursor.execute(\"\\1\")",
+                "pattern": r"""cursor\.execute\(\s*f(?:"([^"\n]*)"|'([^'\n]*)')\s*\)""",
+                "replacement": "cursor.execute(\"\\1\\2\")",
                 "validation": "sql_safe"
             }
         ],
@@ -40,13 +50,7 @@ SECURITY_PATCHES = {
         "prerequisites": ["import sqlite3", "import mysql.connector"],
         "author": "Security Team",
         "version": "1.0",
-        "created": "2024-01-15",
-        "test_cases": [
-            {
-                "input": "cursor.execute(\"SELECT * FROM users WHERE id = %s\" % user_id)",
-                "expected": "cursor.execute(\"SELECT * FROM users WHERE id = ?\", user_id)"
-            }
-        ]
+        "created": "2024-01-15"
     },
     
     "fix_hardcoded_secrets": {
@@ -80,13 +84,7 @@ SECURITY_PATCHES = {
         "dependencies": [],
         "author": "Security Team",
         "version": "1.1", 
-        "created": "2024-01-20",
-        "test_cases": [
-            {
-                "input": "api_key = \"sk_1234567890abcdef\"",
-                "expected": "api_key = os.getenv('API_KEY', '')"
-            }
-        ]
+        "created": "2024-01-20"
     },
     
     "fix_ssl_verification": {
@@ -183,3 +181,69 @@ SECURITY_PATCHES = {
         "created": "2024-02-05"
     }
 }
+
+
+def get_test_cases(pid: str) -> tuple:
+    """Test cases for a security patch, loaded from patches._test_cases on first use"""
+    from patches._test_cases import TEST_CASES
+    return TEST_CASES.get(pid, ())
+
+
+def _compile(pattern: str):
+    """Compile a scan pattern with RE2 when installed, whose matching time is linear in the line length"""
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass  # Constructs RE2 does not support fall back to re
+    return re.compile(pattern)
+
+
+# Metadata repeated across patches; equal literals in this module are already one object,
+# interning also makes them the same object as in the other patch modules
+_INTERNED_FIELDS = ("category", "severity", "risk_level", "author", "version")
+
+
+def _precompile(patches: dict) -> dict:
+    """Compile every sub-patch's regex once at import, stored under '_compiled' for the patch engine"""
+    compiled_patterns = {}
+    for patch_def in patches.values():
+        # Shared with every other patch module through the interpreter's intern table
+        for field in _INTERNED_FIELDS:
+            if isinstance(patch_def.get(field), str):
+                patch_def[field] = sys.intern(patch_def[field])
+        patch_def["files"] = [sys.intern(glob) for glob in patch_def["files"]]
+
+        for sub_patch in patch_def["patches"]:
+            pattern = sub_patch.get("pattern") or sub_patch.get("before") or sub_patch.get("after")
+            if pattern:
+                if pattern not in compiled_patterns:
+                    compiled_patterns[pattern] = _compile(pattern)
+                sub_patch["_compiled"] = compiled_patterns[pattern]
+            sub_patch["type"] = sys.intern(sub_patch["type"])
+            if "validation" in sub_patch:
+                sub_patch["validation"] = sys.intern(sub_patch["validation"])
+        _union_patterns(patch_def["patches"])
+    return compiled_patterns
+
+
+# Group references would point at the wrong group once patterns share one alternation
+_UNCOMBINABLE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _union_patterns(patches_list: list):
+    """Give a patch's line replacements one shared alternation, so a line is scanned once for all of them"""
+    replacements = [sub_patch for sub_patch in patches_list
+                    if sub_patch["type"] in ("replace_pattern", "replace_pattern_all")
+                    and not sub_patch.get("match_line")]
+    if len(replacements) < 2 or any(_UNCOMBINABLE.search(sub_patch["pattern"]) for sub_patch in replacements):
+        return
+
+    # Only used to rule lines out, so the alternatives need no group of their own
+    union = _compile("|".join(f"(?:{sub_patch['pattern']})" for sub_patch in replacements))
+    for sub_patch in replacements:
+        sub_patch["_union"] = union
+
+
+# Compiled once at import; the engine reuses '_compiled' for every file and line it scans
+_COMPILED_PATTERNS = _precompile(SECURITY_PATCHES)
@@ -3,24 +3,47 @@
 Integration test for the complete Professional Patch Tool
 """
 
+import io
 import os
 import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
 from patch_tool import ProfessionalPatchTool
 from utils import RegexUtils, Validation, PatchValidator
 from patches import PATCHES
+from patches.security_fixes import SECURITY_PATCHES, get_test_cases
+from core import FileManager, PatchEngine
+from features.patch_history import PatchHistory
+from features.batch_operations import BatchOperations
+from features.predefined_fixes import PredefinedFixes, HYPERSCAN_AVAILABLE
+from patches._transforms import LIBCST_AVAILABLE
+
+# Attributes every tool instance must expose, checked in one pass
+_EXPECTED_ATTRS = ("regex_utils", "patch_validator", "patches_library")
+
+# Shared across runs, like the runtime's cached validator
+_REGEX_UTILS = RegexUtils()
+_PATCH_VALIDATOR = PatchValidator(_REGEX_UTILS)
 
 def test_integration():
     """Test that all modules work together"""
     print("🧪 Running integration tests...")
     
     # Test utility modules
-    regex_utils = RegexUtils()
+    regex_utils = _REGEX_UTILS
     validation = Validation()
-    patch_validator = PatchValidator(regex_utils)
+    patch_validator = _PATCH_VALIDATOR
     
     # Test patches loading
-    assert len(PATCHES) > 0, "No patches loaded"
-    print(f"✅ Loaded {len(PATCHES)} predefined patches")
+    patch_ids = PATCHES.keys()
+    assert len(patch_ids) > 0, "No patches loaded"
+    print(f"✅ Loaded {len(patch_ids)} predefined patches")
+
+    # Security test cases live outside the patch table and load on request
+    assert all('test_cases' not in patch for patch in SECURITY_PATCHES.values()), "Test cases built at import"
+    assert get_test_cases('fix_sql_injection'), "Security test cases not found"
+    assert get_test_cases('unknown_patch') == (), "Unexpected test cases for unknown patch"
+    print("✅ Security test cases load on demand")
     
     # Test patch validation
     test_patch = {
@@ -40,9 +63,148 @@ def test_integration():
         tool.base_path = temp_dir
         
         # Test that all modules are initialized
-        assert hasattr(tool, 'regex_utils'), "RegexUtils not initialized"
-        assert hasattr(tool, 'patch_validator'), "PatchValidator not initialized"
-        assert hasattr(tool, 'patches_library'), "Patches library not loaded"
+        missing = [attr for attr in _EXPECTED_ATTRS if not hasattr(tool, attr)]
+        assert not missing, f"Modules not initialized: {', '.join(missing)}"
+
+        # Fixtures are written and read back as raw bytes, one call each
+        fixtures = {
+            'app.py': b"def main():\n    print('hello')\n",
+            'config.json': b'{\n    "timeout": 5\n}\n',
+            'settings.py': b'DEBUG = True\r\nPORT = 80\r\n',
+        }
+        for name, content in fixtures.items():
+            Path(temp_dir, name).write_bytes(content)
+
+        file_manager = FileManager(temp_dir, tool.config_manager)
+        patch_engine = PatchEngine(file_manager, tool.config_manager)
+        success, result = patch_engine.apply_patches('config.json', [{
+            'type': 'replace_pattern',
+            'pattern': r'"timeout":\s*\d+',
+            'code': ['"timeout": 30'],
+            'description': 'Test patch'
+        }])
+        assert success, f"Patch application failed: {result.get('error')}"
+        assert Path(temp_dir, 'config.json').read_bytes() == b'{\n    "timeout": 30\n}\n', "Unexpected patch result"
+        assert Path(temp_dir, 'app.py').read_bytes() == fixtures['app.py'], "Untouched fixture changed"
+        print("✅ Patch engine applied a patch to fixture files")
+
+        # CRLF files are read with universal newlines, so '$' must still match at line ends
+        success, result = patch_engine.apply_patches('settings.py', [{
+            'type': 'replace_pattern_all',
+            'pattern': r'DEBUG = True$',
+            'code': ['DEBUG = False'],
+            'description': 'Test patch'
+        }])
+        assert success, f"CRLF patch application failed: {result.get('error')}"
+        assert b'DEBUG = False' in Path(temp_dir, 'settings.py').read_bytes(), "CRLF file not patched"
+        Path(temp_dir, 'settings.py').write_bytes(fixtures['settings.py'])
+
+        # A literal newline in the pattern must not rule the file out either
+        success, result = patch_engine.apply_patches('settings.py', [{
+            'type': 'replace_pattern_all',
+            'pattern': r'PORT = 80\n',
+            'code': ['PORT = 8080'],
+            'description': 'Test patch'
+        }])
+        assert success, f"Newline pattern application failed: {result.get('error')}"
+        assert b'PORT = 8080' in Path(temp_dir, 'settings.py').read_bytes(), "Newline pattern not applied"
+        print("✅ Patch engine matched line ends in a CRLF file")
+
+        # str '\s' matches the ASCII separators \x1c-\x1f that bytes '\s' does not
+        Path(temp_dir, 'sep.py').write_bytes(b'a\x1cb = 1\n')
+        success, result = patch_engine.apply_patches('sep.py', [{
+            'type': 'replace_pattern_all',
+            'pattern': r'a\sb',
+            'code': ['ab'],
+            'description': 'Test patch'
+        }])
+        assert success, f"Separator patch application failed: {result.get('error')}"
+        assert Path(temp_dir, 'sep.py').read_bytes() == b'ab\n', "Separator character not matched"
+
+        # Undo copies the backup taken by apply_patches back byte for byte, once its hash checks out
+        history = PatchHistory(file_manager)
+        undo_path = Path(temp_dir, 'undo.py')
+        undo_path.write_bytes(b'before = 1\r\n')
+        undo_patch = [{'type': 'replace_pattern_all', 'pattern': 'before', 'code': ['after'], 'description': 'Rename'}]
+        original_content = file_manager.read_file_lines('undo.py')
+        success, result = patch_engine.apply_patches('undo.py', undo_patch)
+        assert success, f"Undo fixture patch failed: {result.get('error')}"
+        history.record_operation('undo.py', undo_patch, original_content, result)
+        assert history.undo_last_operation(), "Undo with a matching backup failed"
+        assert undo_path.read_bytes() == b'before = 1\r\n', "Undo did not restore the original bytes"
+
+        original_content = file_manager.read_file_lines('undo.py')
+        success, result = patch_engine.apply_patches('undo.py', undo_patch)
+        assert success, f"Undo fixture patch failed: {result.get('error')}"
+        history.record_operation('undo.py', undo_patch, original_content, result)
+        patched = undo_path.read_bytes()
+        for backup in Path(file_manager.backup_dir).glob('undo.py.*.bak'):
+            backup.write_bytes(b'other = 1\n')
+        assert not history.undo_last_operation(), "Undo restored a backup of different content"
+        assert undo_path.read_bytes() == patched, "Mismatched backup was written"
+        history.flush()
+        print("✅ History undo checked backups against recorded hashes")
+
+        # The history view lists applied and undone operations together, newest first
+        for name in ('view_a.py', 'view_b.py', 'view_c.py'):
+            history.record_operation(name, [], ['pass\n'], {'backup_path': ''})
+        assert history.undo_last_operation() and history.undo_last_operation(), "Undo of inline content failed"
+        view = io.StringIO()
+        with redirect_stdout(view):
+            history._view_operation_history()
+        shown = [line.rsplit(' - ', 1)[1] for line in view.getvalue().splitlines() if ' - ' in line]
+        assert len(shown) == 3 and shown == sorted(shown, reverse=True), f"History view out of order: {shown}"
+        history.flush()
+        print("✅ History view merged the undo and redo stacks newest first")
+
+        # The optional Hyperscan path matcher must agree with the re fallback
+        if HYPERSCAN_AVAILABLE:
+            # Globs whose translation Hyperscan compiles, so its scan is the one exercised
+            matches = PredefinedFixes(patch_engine, file_manager)._path_matcher(['src/*.py', '*.json'])
+            assert matches('src/app.py') and matches('config.json'), "Hyperscan matcher missed a path"
+            assert not matches('src/app.pyc'), "Hyperscan matcher matched a wrong path"
+            print("✅ Hyperscan path matcher working")
+        else:
+            print("⏭️  Hyperscan not installed, skipping its path matcher")
+
+        # Cached fix targets notice files added to existing subdirectories
+        Path(temp_dir, 'pkg').mkdir()
+        predefined_fixes = PredefinedFixes(patch_engine, file_manager)
+        assert 'pkg/mod.py' not in predefined_fixes._find_target_files(['**/*.py']), "Unexpected fix target"
+        Path(temp_dir, 'pkg', 'mod.py').write_bytes(b'pass\n')
+        Path(temp_dir, 'pkg', 'blob.py').write_bytes(b'\x00\x01binary')
+        targets = predefined_fixes._find_target_files(['**/*.py'])
+        assert 'pkg/mod.py' in targets, "New file in subdirectory missed"
+        assert 'pkg/blob.py' not in targets, "Binary file offered as a fix target"
+        print("✅ Fix target cache noticed a new file in a subdirectory")
+
+        # The builtin type hint fix runs as a syntax-tree transform that leaves value-returning functions alone
+        if LIBCST_AVAILABLE:
+            Path(temp_dir, 'hints.py').write_bytes(b'import typing\n\n\ndef total(x: "typing.Any"):\n    return x + 1\n\n\n'
+                                                   b'def ticks():\n    yield 1\n\n\ndef log(x):\n    print(x)\n')
+            add_type_hints = predefined_fixes.patch_library.patches['add_type_hints']
+            assert predefined_fixes._apply_fix_to_file('hints.py', add_type_hints), "Type hint fix failed"
+            hinted = Path(temp_dir, 'hints.py').read_text()
+            assert 'def log(x) -> None:' in hinted, "Type hint not added"
+            assert 'def total(x: "typing.Any"):' in hinted and 'def ticks():' in hinted, "Type hint added to a value"
+
+            # Names used only in string annotations keep their imports
+            success, result = patch_engine.apply_patches('hints.py', [{
+                'type': 'replace_pattern', 'pattern': r'^import\s+(\w+)$', 'code': ['# import \\1  # UNUSED'],
+                'ast_transform': 'RemoveUnusedImports', 'description': 'Remove unused imports'
+            }])
+            assert 'import typing\n' in Path(temp_dir, 'hints.py').read_text(), "Import used in an annotation removed"
+            print("✅ Syntax-tree fixes respected return values and string annotations")
+        else:
+            print("⏭️  libcst not installed, skipping syntax-tree fixes")
+
+        # Batch find/replace goes through the engine, backup included
+        batch_operations = BatchOperations(patch_engine, file_manager)
+        results = batch_operations._apply_batch_find_replace(['app.py'], r"print\('hello'\)", "print('hi')")
+        assert results[0]['success'], f"Batch find/replace failed: {results[0]['result'].get('error')}"
+        assert Path(temp_dir, 'app.py').read_bytes() == b"def main():\n    print('hi')\n", "Batch replace result wrong"
+        assert Path(results[0]['result']['backup_path']).read_bytes() == fixtures['app.py'], "Batch backup missing"
+        print("✅ Batch find/replace applied through the patch engine with a backup")
         
         print("✅ All modules integrated successfully")
         print("🎉 Integration tests passed!")
@@ -4,9 +4,27 @@ UI module for Professional Patch Tool
 User interface components and interactive menus
 """
 
-from .interactive_menus import MenuSystem, PatchMenu, MainMenu
-from .syntax_highlighter import SyntaxHighlighter
-from .preview_renderer import PreviewRenderer
+import importlib
+
+# UI modules are only imported when one of their classes is first accessed (PEP 562)
+_LAZY = {
+    'MenuSystem': '.interactive_menus',
+    'PatchMenu': '.interactive_menus',
+    'MainMenu': '.interactive_menus',
+    'SyntaxHighlighter': '.syntax_highlighter',
+    'PreviewRenderer': '.preview_renderer',
+}
+
+
+def __getattr__(name: str):
+    """Import a UI module on first access to one of its classes"""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'MenuSystem',
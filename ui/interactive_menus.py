@@ -6,9 +6,43 @@ All menu systems and user interaction handlers
 
 import os
 import sys
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 
+# Erase the display and home the cursor
+_CLEAR_SEQ = "\x1b[2J\x1b[H"
+
+
+def _readline(prompt: str = "") -> str:
+    """Read one line like input(), but without its unconditional flushes when there is no prompt"""
+    if prompt:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line[:-1] if line.endswith('\n') else line
+
+
+@lru_cache(maxsize=None)
+def _windows_console():
+    """Kernel32, the stdout console handle and the screen buffer info type, looked up once"""
+    import ctypes
+    from ctypes import wintypes
+
+    class ScreenBufferInfo(ctypes.Structure):
+        _fields_ = [
+            ('dwSize', wintypes._COORD),
+            ('dwCursorPosition', wintypes._COORD),
+            ('wAttributes', wintypes.WORD),
+            ('srWindow', wintypes.SMALL_RECT),
+            ('dwMaximumWindowSize', wintypes._COORD),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    return kernel32, kernel32.GetStdHandle(-11), ScreenBufferInfo
+
 
 class MenuSystem:
     """Base menu system with common functionality"""
@@ -17,28 +51,36 @@ class MenuSystem:
         self.tool = tool_instance
         self.menu_history = []
         self.current_context = {}
+        self._clear = self._clear_windows_console if os.name == 'nt' else self._clear_ansi
 
-    def display_menu(self, title: str, options: List[Dict], prompt: str = "Select option") -> str:
-        """Display a menu and get user selection"""
-        print(f"\n{title}")
-        print("=" * 60)
-
+    def render_menu(self, title: str, options: List[Dict]) -> str:
+        """Render a menu's title and options as one block of text"""
+        rendered = [f"\n{title}", "=" * 60]
         for option in options:
             if option.get('separator'):
-                print("-" * 60)
+                rendered.append("-" * 60)
             else:
-                print(f"{option['key']}. {option['label']}")
+                rendered.append(f"{option['key']}. {option['label']}")
                 if option.get('description'):
-                    print(f"   {option['description']}")
+                    rendered.append(f"   {option['description']}")
+        rendered.append("=" * 60)
+        return "\n".join(rendered)
 
-        print("=" * 60)
+    def display_menu(self, title: str, options: List[Dict], prompt: str = "Select option") -> str:
+        """Display a menu and get user selection"""
+        valid_choices = frozenset(opt['key'] for opt in options if not opt.get('separator'))
+        return self.prompt_choice(title, self.render_menu(title, options), valid_choices, prompt)
+
+    def prompt_choice(self, title: str, rendered: str, valid_choices: frozenset, prompt: str) -> str:
+        """Print an already rendered menu and read until a valid choice is entered"""
+        sys.stdout.write(rendered + "\n")
+        sys.stdout.flush()
 
         while True:
             try:
-                choice = input(f"\n{prompt}: ").strip()
+                choice = _readline(f"\n{prompt}: ").strip()
 
                 # Check if choice matches any option key
-                valid_choices = [opt['key'] for opt in options if not opt.get('separator')]
                 if choice in valid_choices:
                     self.menu_history.append({
                         'menu': title,
@@ -59,7 +101,7 @@ class MenuSystem:
     def get_confirmation(self, message: str, default: bool = False) -> bool:
         """Get user confirmation"""
         default_text = "Y/n" if default else "y/N"
-        response = input(f"{message} [{default_text}]: ").strip().lower()
+        response = _readline(f"{message} [{default_text}]: ").strip().lower()
 
         if not response:
             return default
@@ -74,7 +116,7 @@ class MenuSystem:
                 full_prompt = f"{prompt}: "
 
             try:
-                value = input(full_prompt).strip()
+                value = _readline(full_prompt).strip()
 
                 if not value:
                     if default:
@@ -99,7 +141,7 @@ class MenuSystem:
         lines = []
         while True:
             try:
-                line = input()
+                line = _readline()
                 if end_marker and line.strip() == end_marker:
                     break
                 if not end_marker and line == "":
@@ -122,12 +164,49 @@ class MenuSystem:
 
     def clear_screen(self):
         """Clear the terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self._clear()
+
+    @staticmethod
+    def _clear_ansi():
+        """Clear with an escape sequence; nothing to clear when stdout is not a terminal"""
+        if sys.stdout.isatty():
+            sys.stdout.write(_CLEAR_SEQ)
+            sys.stdout.flush()
+
+    @staticmethod
+    def _clear_windows_console():
+        """Blank the console buffer and home the cursor through the Win32 console API"""
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32, handle, info_type = _windows_console()
+        info = info_type()
+        if not kernel32.GetConsoleScreenBufferInfo(handle, ctypes.byref(info)):
+            return  # Not a console, e.g. redirected output
+
+        cells = info.dwSize.X * info.dwSize.Y
+        origin = wintypes._COORD(0, 0)
+        written = wintypes.DWORD()
+        kernel32.FillConsoleOutputCharacterW(handle, ctypes.c_wchar(' '), cells, origin, ctypes.byref(written))
+        kernel32.FillConsoleOutputAttribute(handle, info.wAttributes, cells, origin, ctypes.byref(written))
+        kernel32.SetConsoleCursorPosition(handle, origin)
 
 
 class MainMenu(MenuSystem):
     """Main application menu system"""
 
+    MAIN_TITLE = "🚀 PROFESSIONAL PATCH TOOL"
+    MAIN_OPTIONS = [
+        {'key': '1', 'label': '📝 Navigate & patch file (UNIX-style)', 'description': 'Interactive file patching'},
+        {'key': '2', 'label': '📝 Enter file path directly', 'description': 'Quick file access'},
+        {'key': '3', 'label': '🛠️ Predefined fixes', 'description': 'Apply automated fixes'},
+        {'key': '4', 'label': '🔀 Batch operations', 'description': 'Multi-file processing'},
+        {'key': '5', 'label': '📂 File history', 'description': 'Recent files'},
+        {'key': '6', 'label': '🔧 Advanced tools', 'description': 'Additional features'},
+        {'key': '7', 'label': '⚙️ Settings', 'description': 'Configure tool behavior'},
+        {'key': '8', 'label': '❌ Exit', 'description': 'Exit the application'}
+    ]
+
     def __init__(self, tool_instance):
         super().__init__(tool_instance)
         self.features_enabled = {
@@ -136,21 +215,18 @@ class MainMenu(MenuSystem):
             'diff_preview': True,
             'patch_history': True
         }
+        # The main menu never changes, so it is rendered once and reprinted each round
+        self._main_rendered = self.render_menu(self.MAIN_TITLE, self.MAIN_OPTIONS)
+        self._main_choices = frozenset(option['key'] for option in self.MAIN_OPTIONS)
+
+    def __iter__(self):
+        """Yield main menu choices for as long as the session runs"""
+        while True:
+            yield self.show_main_menu()
 
     def show_main_menu(self):
         """Display the main application menu"""
-        options = [
-            {'key': '1', 'label': '📝 Navigate & patch file (UNIX-style)', 'description': 'Interactive file patching'},
-            {'key': '2', 'label': '📝 Enter file path directly', 'description': 'Quick file access'},
-            {'key': '3', 'label': '🛠️ Predefined fixes', 'description': 'Apply automated fixes'},
-            {'key': '4', 'label': '🔀 Batch operations', 'description': 'Multi-file processing'},
-            {'key': '5', 'label': '📂 File history', 'description': 'Recent files'},
-            {'key': '6', 'label': '🔧 Advanced tools', 'description': 'Additional features'},
-            {'key': '7', 'label': '⚙️ Settings', 'description': 'Configure tool behavior'},
-            {'key': '8', 'label': '❌ Exit', 'description': 'Exit the application'}
-        ]
-
-        return self.display_menu("🚀 PROFESSIONAL PATCH TOOL", options, "Select option (1-8)")
+        return self.prompt_choice(self.MAIN_TITLE, self._main_rendered, self._main_choices, "Select option (1-8)")
 
     def show_advanced_tools_menu(self):
         """Display advanced tools menu"""
@@ -743,16 +819,19 @@ class PatchMenu(MenuSystem):
             print("❌ No patches in queue")
             return True
 
-        print(f"\n📋 PATCH QUEUE ({len(patches)} patches):")
+        rendered = [f"\n📋 PATCH QUEUE ({len(patches)} patches):"]
         for i, patch in enumerate(patches, 1):
-            print(f"  {i}. {patch['description']}")
+            rendered.append(f"  {i}. {patch['description']}")
 
             if 'code' in patch and patch['code']:
                 code_preview = ' | '.join(patch['code'][:2])
                 if len(patch['code']) > 2:
                     code_preview += f" ... (+{len(patch['code'])-2} lines)"
-                print(f"      Code: {code_preview}")
+                rendered.append(f"      Code: {code_preview}")
 
+        # One write for the whole queue instead of a print per line
+        sys.stdout.write("\n".join(rendered) + "\n")
+        sys.stdout.flush()
         return True
 
     def _preview_changes(self) -> bool:
@@ -789,6 +868,11 @@ class PatchMenu(MenuSystem):
                 print("❌ Patch application cancelled")
                 return True
 
+        # Read before applying, so history records the content the patches replaced
+        original_content = None
+        if hasattr(self.tool, 'patch_history'):
+            original_content = self.tool.file_manager.read_file_lines(file_path)
+
         # Use the patch engine to apply patches
         success, result = self.tool.patch_engine.apply_patches(file_path, patches)
 
@@ -797,12 +881,10 @@ class PatchMenu(MenuSystem):
             print(f"📊 File changed: {result['original_lines']} → {result['new_lines']} lines")
 
             # Record in history if available
-            if hasattr(self.tool, 'patch_history'):
-                original_content = self.tool.file_manager.read_file_lines(file_path)
-                if original_content:
-                    self.tool.patch_history.record_operation(
-                        file_path, patches, original_content, result
-                    )
+            if original_content:
+                self.tool.patch_history.record_operation(
+                    file_path, patches, original_content, result
+                )
 
             # Show summary
             self._show_patch_summary(file_path)
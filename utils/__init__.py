@@ -4,7 +4,7 @@ Utils module for Professional Patch Tool
 Utility functions and helper classes
 """
 
-from .regex_utils import RegexUtils, FuzzyMatcher, MultiLineMatcher
+from .regex_utils import RegexUtils, FuzzyMatcher, MultiLineMatcher, compile_pattern, required_literal
 from .line_utils import LineUtils, IndentationDetector, BlockDetector
 from .validation import Validation, PatchValidator, FileValidator
 
@@ -12,6 +12,8 @@ __all__ = [
     'RegexUtils',
     'FuzzyMatcher',
     'MultiLineMatcher',
+    'compile_pattern',
+    'required_literal',
     'LineUtils', 
     'IndentationDetector',
     'BlockDetector',
@@ -9,6 +9,61 @@ import difflib
 from typing import List, Dict, Any, Optional, Tuple, Pattern, Callable
 from functools import lru_cache
 
+try:
+    import re._parser as _sre_parse
+    import re._constants as _sre_constants
+except ImportError:
+    # Python < 3.11 ships the regex parser as top-level modules
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_constants
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+def compile_pattern(pattern: str, backend: str = "re"):
+    """Compile with the requested backend, using re when RE2 is missing or rejects the pattern"""
+    if backend == "re2" and RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass  # Backreferences and lookarounds are not supported by RE2
+    return re.compile(pattern)
+
+
+def required_literal(pattern: str, flags: int = 0) -> str:
+    """Longest literal run every match of the pattern must contain, or '' when none can be proven"""
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except re.error:
+        return ''
+    if parsed.state.flags & re.IGNORECASE:
+        return ''
+
+    runs = []
+
+    def walk(items):
+        run = []
+        for op, av in items:
+            # Line endings are normalized when files are read, so they never anchor a raw-bytes search
+            if op is _sre_constants.LITERAL and chr(av) not in '\r\n':
+                run.append(chr(av))
+                continue
+            runs.append(''.join(run))
+            run = []
+            # Groups and repeats taken at least once are mandatory, so their literals count too
+            if op is _sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:
+                walk(av[3])
+            elif op in (_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT) and av[0] >= 1:
+                walk(av[2])
+        runs.append(''.join(run))
+
+    walk(parsed)
+    return max(runs, key=len)
+
 
 class RegexUtils:
     """Advanced regex utilities with caching and validation"""